@@ -1,19 +1,208 @@
 # modules/campaign_db.py
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+from collections import defaultdict
 from datetime import date
-from modules.db import get_supabase
+import streamlit as st
+from modules.db import get_supabase, retry_db, run_parallel
+
+
+# ============================================================
+# Cached reads
+# Streamlit reruns the page script on every interaction, so raw
+# Supabase rows are cached for a short TTL (keyed on campaign_id).
+# Every write below clears the matching cache entry.
+# ============================================================
+
+# Columns the pages actually read (selects, dates, distribution, exports)
+CAMPAIGN_COLUMNS = "id,name,start_date,end_date,distribution_mode,currency,created_at"
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_campaigns_cached() -> List[Dict[str, Any]]:
+    supabase = get_supabase()
+    resp = retry_db(supabase.table("campaigns").select(CAMPAIGN_COLUMNS).order("created_at", desc=True).execute)
+    return resp.data or []
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_campaign_cached(campaign_id: str) -> Optional[Dict[str, Any]]:
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("campaigns")
+        .select(CAMPAIGN_COLUMNS)
+        .eq("id", campaign_id)
+        .limit(1)
+        .execute
+    )
+    return resp.data[0] if resp.data else None
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_campaign_products_cached(campaign_id: str) -> List[Dict[str, Any]]:
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("campaign_quantities")
+        .select("id,product_id,total_qty")
+        .eq("campaign_id", campaign_id)
+        .execute
+    )
+    return resp.data or []
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_month_weights_cached(campaign_id: str) -> List[Dict[str, Any]]:
+    """Campaign-level month weights (product_id IS NULL, filtered server-side)."""
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("campaign_month_weights")
+        .select("id,month_label,weight")
+        .eq("campaign_id", campaign_id)
+        .is_("product_id", "null")
+        .execute
+    )
+    return resp.data or []
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_product_month_weights_cached(campaign_id: str) -> List[Dict[str, Any]]:
+    """Per-product month weights (product_id IS NOT NULL, filtered server-side)."""
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("campaign_month_weights")
+        .select("product_id,month_label,weight")
+        .eq("campaign_id", campaign_id)
+        .not_.is_("product_id", "null")
+        .execute
+    )
+    return resp.data or []
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_size_breakdown_cached(campaign_id: str) -> List[Dict[str, Any]]:
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("campaign_size_breakdown")
+        .select("id,product_id,size,qty")
+        .eq("campaign_id", campaign_id)
+        .execute
+    )
+    return resp.data or []
+
+
+# ============================================================
+# Bulk writes (and id lists in delete filters) are sent in batches
+# so large campaigns stay under PostgREST request/URL size limits.
+# ============================================================
+
+BATCH_SIZE = 500
+
+
+def _chunked(items: List[Any], n: int = BATCH_SIZE):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+# ============================================================
+# Server-side replace (optional)
+# When these Postgres functions exist, a save is a single RPC that
+# DELETEs and INSERTs in one transaction. Without them (PGRST202) the
+# REST upsert/delete path is used; any other RPC error is raised.
+# Extra keys in rows (e.g. "id") are ignored by the functions.
+#
+#   create or replace function fn_replace_campaign_quantities(cid uuid, rows jsonb)
+#   returns void language plpgsql as $$
+#   begin
+#     delete from campaign_quantities where campaign_id = cid;
+#     insert into campaign_quantities (campaign_id, product_id, total_qty)
+#     select cid, (r->>'product_id')::uuid, (r->>'total_qty')::float
+#     from jsonb_array_elements(rows) r;
+#   end $$;
+#
+#   create or replace function fn_replace_month_weights(cid uuid, rows jsonb)
+#   returns void language plpgsql as $$
+#   begin
+#     delete from campaign_month_weights where campaign_id = cid and product_id is null;
+#     insert into campaign_month_weights (campaign_id, month_label, weight)
+#     select cid, r->>'month_label', (r->>'weight')::float
+#     from jsonb_array_elements(rows) r;
+#   end $$;
+#
+#   create or replace function fn_replace_size_breakdown(cid uuid, rows jsonb)
+#   returns void language plpgsql as $$
+#   begin
+#     delete from campaign_size_breakdown where campaign_id = cid;
+#     insert into campaign_size_breakdown (campaign_id, product_id, size, qty)
+#     select cid, (r->>'product_id')::uuid, r->>'size', (r->>'qty')::float
+#     from jsonb_array_elements(rows) r;
+#   end $$;
+# ============================================================
+
+_MISSING_RPCS: set = set()
+
+
+def _replace_via_rpc(fn: str, campaign_id: str, rows: List[Dict[str, Any]]) -> bool:
+    """
+    Replace a campaign's rows through a server-side function.
+    Returns False (nothing written) if the function isn't available.
+    """
+    if fn in _MISSING_RPCS:
+        return False
+
+    supabase = get_supabase()
+    try:
+        supabase.rpc(fn, {"cid": campaign_id, "rows": rows}).execute()
+    except Exception as e:
+        # Function not deployed: remember it and stop trying this process.
+        # Anything else (e.g. a timeout) may have committed already, and a
+        # REST fallback would re-insert rows under the old ids → re-raise.
+        if getattr(e, "code", None) != "PGRST202":
+            raise
+        _MISSING_RPCS.add(fn)
+        return False
+    return True
 
 
 # ============================================================
 # Campaigns (high-level)
 # ============================================================
 
+_DEFAULT_CAMPAIGN_KEY = "_default_campaign_id"
+
+
+def _serialize_dates(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """dates → ISO strings (returns a new dict, the caller's is untouched)."""
+    return {k: (v.isoformat() if isinstance(v, date) else v) for k, v in fields.items()}
+
+
 def fetch_campaigns() -> List[Dict[str, Any]]:
+    return _fetch_campaigns_cached()
+
+
+def fetch_campaign(campaign_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Single campaign by id (server-side lookup instead of scanning
+    every campaign). Returns None if it doesn't exist.
+    """
+    campaign = _fetch_campaign_cached(campaign_id)
+    if campaign is None:
+        # don't cache a miss: the campaign may be created by another session
+        _fetch_campaign_cached.clear(campaign_id)
+    return campaign
+
+
+def fetch_latest_campaign() -> Optional[Dict[str, Any]]:
+    """Most recently created campaign (one row), or None if there are none."""
     supabase = get_supabase()
-    resp = supabase.table("campaigns").select("*").order("created_at", desc=True).execute()
-    return resp.data or []
+    resp = retry_db(
+        supabase.table("campaigns")
+        .select(CAMPAIGN_COLUMNS)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute
+    )
+    return resp.data[0] if resp.data else None
 
 
 def create_campaign(
@@ -24,38 +213,53 @@ def create_campaign(
     currency: str = "BDT"
 ) -> Dict[str, Any]:
     supabase = get_supabase()
-    payload = {
+    payload = _serialize_dates({
         "name": name,
-        "start_date": str(start_date),
-        "end_date": str(end_date),
+        "start_date": start_date,
+        "end_date": end_date,
         "distribution_mode": distribution_mode,
         "currency": currency,
-    }
-    resp = supabase.table("campaigns").insert(payload).execute()
+    })
+    resp = retry_db(supabase.table("campaigns").insert(payload).execute, idempotent=False)
+    _fetch_campaigns_cached.clear()
+    # the new campaign is now the latest one
+    st.session_state.pop(_DEFAULT_CAMPAIGN_KEY, None)
     return resp.data[0]
 
 
 def update_campaign(campaign_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
-    if "start_date" in fields and isinstance(fields["start_date"], date):
-        fields["start_date"] = str(fields["start_date"])
-    if "end_date" in fields and isinstance(fields["end_date"], date):
-        fields["end_date"] = str(fields["end_date"])
-    resp = supabase.table("campaigns").update(fields).eq("id", campaign_id).execute()
+    # Stays a plain UPDATE: an upsert with only some columns would hit the
+    # NOT NULL checks on its INSERT arm before the conflict is resolved.
+    resp = retry_db(supabase.table("campaigns").update(_serialize_dates(fields)).eq("id", campaign_id).execute)
+    _fetch_campaigns_cached.clear()
+    _fetch_campaign_cached.clear(campaign_id)
     return resp.data[0]
 
 
 def get_latest_campaign_or_create_default() -> Dict[str, Any]:
-    campaigns = fetch_campaigns()
-    if campaigns:
-        return campaigns[0]
-    return create_campaign(
-        name="Default Campaign",
-        start_date=date(2026, 2, 1),
-        end_date=date(2026, 4, 1),
-        distribution_mode="Uniform",
-        currency="BDT"
-    )
+    """
+    The default campaign is resolved once per session; later calls look
+    it up by id. Falls back to the latest campaign if that one is gone.
+    """
+    cid = st.session_state.get(_DEFAULT_CAMPAIGN_KEY)
+    if cid:
+        campaign = fetch_campaign(cid)
+        if campaign:
+            return campaign
+
+    campaign = fetch_latest_campaign()
+    if not campaign:
+        campaign = create_campaign(
+            name="Default Campaign",
+            start_date=date(2026, 2, 1),
+            end_date=date(2026, 4, 1),
+            distribution_mode="Uniform",
+            currency="BDT"
+        )
+
+    st.session_state[_DEFAULT_CAMPAIGN_KEY] = campaign["id"]
+    return campaign
 
 
 # ============================================================
@@ -68,24 +272,10 @@ def fetch_campaign_products(campaign_id: str) -> Tuple[Dict[str, float], Dict[st
     - quantities: product_id -> total_qty
     - row_ids: product_id -> campaign_quantities.id
     """
-    supabase = get_supabase()
-    resp = (
-        supabase.table("campaign_quantities")
-        .select("*")
-        .eq("campaign_id", campaign_id)
-        .execute()
-    )
-    rows = resp.data or []
+    rows = _fetch_campaign_products_cached(campaign_id)
 
-    quantities: Dict[str, float] = {}
-    row_ids: Dict[str, str] = {}
-
-    for r in rows:
-        pid = r["product_id"]
-        # support either total_qty or qty if you still have old column
-        qty_val = r.get("total_qty", r.get("qty", 0))
-        quantities[pid] = float(qty_val or 0)
-        row_ids[pid] = r["id"]
+    quantities: Dict[str, float] = {r["product_id"]: float(r["total_qty"] or 0) for r in rows}
+    row_ids: Dict[str, str] = {r["product_id"]: r["id"] for r in rows}
 
     return quantities, row_ids
 
@@ -93,20 +283,35 @@ def fetch_campaign_products(campaign_id: str) -> Tuple[Dict[str, float], Dict[st
 def save_campaign_products(campaign_id: str, quantities: Dict[str, float]) -> None:
     supabase = get_supabase()
 
-    supabase.table("campaign_quantities").delete().eq("campaign_id", campaign_id).execute()
+    # Existing rows are updated in place (matched on their id), new products
+    # are inserted, and only rows for dropped products are deleted.
+    _fetch_campaign_products_cached.clear(campaign_id)  # match current rows, not a cached read
+    _, row_ids = fetch_campaign_products(campaign_id)
 
-    payload = [
-        {
+    payload = []
+    for pid, qty in quantities.items():
+        if float(qty) <= 0:
+            continue
+        row = {
             "campaign_id": campaign_id,
             "product_id": pid,
             "total_qty": float(qty)
         }
-        for pid, qty in quantities.items()
-        if float(qty) > 0
-    ]
+        if pid in row_ids:
+            row["id"] = row_ids[pid]
+        payload.append(row)
+
+    kept = {r["product_id"] for r in payload}
+    obsolete_ids = [rid for pid, rid in row_ids.items() if pid not in kept]
+
+    if not _replace_via_rpc("fn_replace_campaign_quantities", campaign_id, payload):
+        for batch in _chunked(payload):
+            # default_to_null=False → new rows (no "id" key) get the column default
+            retry_db(supabase.table("campaign_quantities").upsert(batch, default_to_null=False).execute)
+        for batch in _chunked(obsolete_ids):
+            retry_db(supabase.table("campaign_quantities").delete().in_("id", batch).execute)
 
-    if payload:
-        supabase.table("campaign_quantities").insert(payload).execute()
+    _fetch_campaign_products_cached.clear(campaign_id)
 
 
 # ============================================================
@@ -118,18 +323,7 @@ def fetch_month_weights(campaign_id: str) -> Dict[str, float]:
     Legacy campaign-level month weights (rows where product_id is NULL).
     Still used for reporting / backwards compatibility.
     """
-    supabase = get_supabase()
-    resp = (
-        supabase.table("campaign_month_weights")
-        .select("*")
-        .eq("campaign_id", campaign_id)
-        .execute()
-    )
-    rows = resp.data or []
-
-    # Only keep rows without product_id → campaign-level weights
-    rows = [r for r in rows if not r.get("product_id")]
-
+    rows = _fetch_month_weights_cached(campaign_id)
     return {r["month_label"]: float(r.get("weight", 1.0)) for r in rows}
 
 
@@ -140,31 +334,35 @@ def save_month_weights(campaign_id: str, weights: Dict[str, float]) -> None:
     """
     supabase = get_supabase()
 
-    # Delete only legacy rows (no product_id)
-    resp = (
-        supabase.table("campaign_month_weights")
-        .select("id, product_id")
-        .eq("campaign_id", campaign_id)
-        .execute()
-    )
-    rows = resp.data or []
-    legacy_ids = [r["id"] for r in rows if not r.get("product_id")]
+    # Same pattern as save_campaign_products: upsert by id, delete leftovers
+    # (only legacy rows, i.e. product_id IS NULL, are read and touched here)
+    _fetch_month_weights_cached.clear(campaign_id)
+    row_ids = {r["month_label"]: r["id"] for r in _fetch_month_weights_cached(campaign_id)}
 
-    if legacy_ids:
-        supabase.table("campaign_month_weights").delete().in_("id", legacy_ids).execute()
-
-    payload = [
-        {
+    payload = []
+    for m, w in weights.items():
+        if float(w) < 0:
+            continue
+        row = {
             "campaign_id": campaign_id,
             "month_label": m,
             "weight": float(w),
             # product_id omitted → NULL
         }
-        for m, w in weights.items()
-        if float(w) >= 0
-    ]
-    if payload:
-        supabase.table("campaign_month_weights").insert(payload).execute()
+        if m in row_ids:
+            row["id"] = row_ids[m]
+        payload.append(row)
+
+    kept = {r["month_label"] for r in payload}
+    obsolete_ids = [rid for m, rid in row_ids.items() if m not in kept]
+
+    if not _replace_via_rpc("fn_replace_month_weights", campaign_id, payload):
+        for batch in _chunked(payload):
+            retry_db(supabase.table("campaign_month_weights").upsert(batch, default_to_null=False).execute)
+        for batch in _chunked(obsolete_ids):
+            retry_db(supabase.table("campaign_month_weights").delete().in_("id", batch).execute)
+
+    _fetch_month_weights_cached.clear(campaign_id)
 
 # ============================================================
 # Per-product month weights (NEW, same table, with product_id)
@@ -176,24 +374,13 @@ def fetch_product_month_weights(campaign_id: str) -> Dict[str, Dict[str, float]]
         {product_id: {month_label: weight, ...}, ...}
     Only rows where product_id IS NOT NULL.
     """
-    supabase = get_supabase()
-    resp = (
-        supabase.table("campaign_month_weights")
-        .select("*")
-        .eq("campaign_id", campaign_id)
-        .execute()
-    )
-    rows = resp.data or []
+    rows = _fetch_product_month_weights_cached(campaign_id)
 
-    out: Dict[str, Dict[str, float]] = {}
+    out: Dict[str, Dict[str, float]] = defaultdict(dict)
     for r in rows:
-        pid = r.get("product_id")
-        if not pid:
-            continue  # skip campaign-level rows
-        out.setdefault(pid, {})
-        out[pid][r["month_label"]] = float(r.get("weight", 0.0) or 0.0)
+        out[r["product_id"]][r["month_label"]] = float(r.get("weight") or 0.0)
 
-    return out
+    return dict(out)
 
 
 def save_product_month_weights(
@@ -205,29 +392,37 @@ def save_product_month_weights(
         {product_id: {month_label: weight, ...}, ...}
     All values are interpreted as 'weights' (we'll treat them as percentages).
     """
+    pids = list(weights_by_product.keys())
+    if not pids:
+        return
+
     supabase = get_supabase()
 
-    for pid, month_dict in weights_by_product.items():
-        # Delete existing rows for this campaign + product
-        supabase.table("campaign_month_weights") \
-            .delete() \
-            .eq("campaign_id", campaign_id) \
-            .eq("product_id", pid) \
-            .execute()
+    # One DELETE for every product being saved (instead of one per product)
+    retry_db(
+        supabase.table("campaign_month_weights")
+        .delete()
+        .eq("campaign_id", campaign_id)
+        .in_("product_id", pids)
+        .execute
+    )
 
-        payload = [
-            {
-                "campaign_id": campaign_id,
-                "product_id": pid,
-                "month_label": m,
-                "weight": float(w),
-            }
-            for m, w in month_dict.items()
-            if float(w) >= 0
-        ]
+    payload = [
+        {
+            "campaign_id": campaign_id,
+            "product_id": pid,
+            "month_label": m,
+            "weight": float(w),
+        }
+        for pid, month_dict in weights_by_product.items()
+        for m, w in month_dict.items()
+        if float(w) >= 0
+    ]
 
-        if payload:
-            supabase.table("campaign_month_weights").insert(payload).execute()
+    for batch in _chunked(payload):
+        retry_db(supabase.table("campaign_month_weights").insert(batch).execute, idempotent=False)
+
+    _fetch_product_month_weights_cached.clear(campaign_id)
 
 
 # ============================================================
@@ -236,20 +431,11 @@ def save_product_month_weights(
 # ============================================================
 
 def fetch_size_breakdown(campaign_id: str) -> Dict[str, Dict[str, float]]:
-    supabase = get_supabase()
-    resp = (
-        supabase.table("campaign_size_breakdown")
-        .select("*")
-        .eq("campaign_id", campaign_id)
-        .execute()
-    )
-    rows = resp.data or []
+    rows = _fetch_size_breakdown_cached(campaign_id)
 
     out: Dict[str, Dict[str, float]] = {}
     for r in rows:
-        pid = r["product_id"]
-        out.setdefault(pid, {})
-        out[pid][r["size"]] = float(r.get("qty", 0) or 0)
+        out.setdefault(r["product_id"], {})[r["size"]] = float(r["qty"] or 0)
 
     return out
 
@@ -257,22 +443,55 @@ def fetch_size_breakdown(campaign_id: str) -> Dict[str, Dict[str, float]]:
 def save_size_breakdown(campaign_id: str, size_breakdown: Dict[str, Dict[str, float]]) -> None:
     supabase = get_supabase()
 
-    supabase.table("campaign_size_breakdown").delete().eq("campaign_id", campaign_id).execute()
+    # Same pattern as save_campaign_products: upsert by id, delete leftovers
+    _fetch_size_breakdown_cached.clear(campaign_id)
+    row_ids = {(r["product_id"], r["size"]): r["id"] for r in _fetch_size_breakdown_cached(campaign_id)}
 
     payload = []
     for pid, sizes in size_breakdown.items():
         for size, qty in sizes.items():
             if float(qty) <= 0:
                 continue
-            payload.append({
+            row = {
                 "campaign_id": campaign_id,
                 "product_id": pid,
                 "size": size,
                 "qty": float(qty)
-            })
+            }
+            if (pid, size) in row_ids:
+                row["id"] = row_ids[(pid, size)]
+            payload.append(row)
+
+    kept = {(r["product_id"], r["size"]) for r in payload}
+    obsolete_ids = [rid for k, rid in row_ids.items() if k not in kept]
+
+    if not _replace_via_rpc("fn_replace_size_breakdown", campaign_id, payload):
+        for batch in _chunked(payload):
+            retry_db(supabase.table("campaign_size_breakdown").upsert(batch, default_to_null=False).execute)
+        for batch in _chunked(obsolete_ids):
+            retry_db(supabase.table("campaign_size_breakdown").delete().in_("id", batch).execute)
+
+    _fetch_size_breakdown_cached.clear(campaign_id)
+
+# ============================================================
+# Forecast inputs (all per-campaign tables in one call)
+# ============================================================
+
+def fetch_campaign_bundle(
+    campaign_id: str
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    """
+    Returns (quantities, month_weights, product_month_weights, size_breakdown)
+    for a campaign. The four reads are independent, so they run concurrently.
+    """
+    (quantities, _), month_weights, product_weights, sizes = run_parallel(
+        (fetch_campaign_products, campaign_id),
+        (fetch_month_weights, campaign_id),
+        (fetch_product_month_weights, campaign_id),
+        (fetch_size_breakdown, campaign_id),
+    )
+    return quantities, month_weights, product_weights, sizes
 
-    if payload:
-        supabase.table("campaign_size_breakdown").insert(payload).execute()
 
 # ============================================================
 # Reporting Helpers (Module 6)
@@ -284,29 +503,3 @@ def get_all_campaigns() -> List[Dict[str, Any]]:
     Used by the Reporting & Export module.
     """
     return fetch_campaigns()
-
-
-def get_campaign_full_data(campaign_id: str) -> Dict[str, Any]:
-    """
-    Return a combined dataset for reporting:
-    - campaign info
-    - quantities
-    - month weights
-    - size breakdown
-    """
-    meta = [c for c in fetch_campaigns() if c["id"] == campaign_id]
-    if not meta:
-        return {}
-
-    meta = meta[0]
-
-    quantities, cp_row_ids = fetch_campaign_products(campaign_id)
-    month_weights = fetch_month_weights(campaign_id)
-    size_breakdown = fetch_size_breakdown(campaign_id)
-
-    return {
-        "campaign": meta,
-        "quantities": quantities,
-        "month_weights": month_weights,
-        "size_breakdown": size_breakdown
-    }
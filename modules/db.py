@@ -1,19 +1,43 @@
 # modules/db.py
+from __future__ import annotations
+
 import streamlit as st
-from supabase import create_client, Client
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple, TypeVar
+import threading
+import random
+import time
 import os
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+T = TypeVar("T")
+
+# Module-level handle so hot paths skip the st.cache_resource lookup;
+# _build_supabase stays cached so a module reload reuses the same client.
+_CLIENT: Optional[Client] = None
+
+
 def get_supabase() -> Client:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = _build_supabase()
+    return _CLIENT
+
+
+@st.cache_resource(show_spinner=False)
+def _build_supabase() -> Client:
     """
     Works locally and on Streamlit Cloud.
     Priority:
     1. Streamlit st.secrets["supabase"]
     2. OS environment variables (optional fallback)
-    """
 
-    # Already created once → return memoized client
-    if "supabase_client" in st.session_state:
-        return st.session_state.supabase_client
+    The client is a shared resource: built once per process and reused
+    across reruns, sessions and users (st.cache_resource).
+    """
 
     # ------------------------------
     # 1. Try Streamlit Secrets
@@ -34,6 +58,94 @@ def get_supabase() -> Client:
                 "Set them in `.streamlit/secrets.toml` (local) or Streamlit Cloud Secrets."
             )
 
-    # Create client and store in session state
-    st.session_state.supabase_client = create_client(url, key)
-    return st.session_state.supabase_client
+    # supabase-py pulls in httpx/postgrest/gotrue/pydantic; import it only
+    # when the client is first built so importing this module stays cheap
+    import httpx
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    # One pooled, keep-alive HTTP client shared by postgrest/auth/storage:
+    # a rerun fires many small queries, so reuse connections instead of
+    # paying a TCP/TLS handshake each time. retries only covers failed
+    # connects, never a request that reached the server.
+    http = httpx.Client(
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(
+                max_connections=60,
+                max_keepalive_connections=40,
+                keepalive_expiry=60,
+            ),
+        ),
+        timeout=30,
+        follow_redirects=True,
+    )
+    options = SyncClientOptions(
+        httpx_client=http,
+        postgrest_client_timeout=30,
+        storage_client_timeout=30,
+    )
+
+    return create_client(url, key, options=options)
+
+
+def run_parallel(*calls: Tuple[Callable[..., Any], ...]) -> List[Any]:
+    """
+    Run independent Supabase calls concurrently (each one is I/O bound).
+    Every call is a tuple (fn, *args); results come back in the same order.
+
+    Worker threads are attached to the current Streamlit script context so
+    st.cache_data fetchers behave exactly as on the main thread.
+    """
+    ctx = get_script_run_ctx()
+
+    def _attach_ctx() -> None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=len(calls) or 1, initializer=_attach_ctx) as pool:
+        futures = [pool.submit(fn, *args) for fn, *args in calls]
+    return [f.result() for f in futures]
+
+
+# PostgREST codes for "the statement never ran" (DB unreachable, schema
+# cache not ready, pool exhausted) and a plain 503 from the gateway.
+_NOT_RUN_CODES = {"PGRST001", "PGRST002", "PGRST003", 503}
+# Gateway errors after the request went through: it may have run.
+_GATEWAY_CODES = {502, 504}
+
+
+def _is_transient(e: Exception, idempotent: bool) -> bool:
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if isinstance(e, httpx.TransportError):
+        return idempotent
+    if isinstance(e, APIError):
+        return e.code in _NOT_RUN_CODES or (idempotent and e.code in _GATEWAY_CODES)
+    return False
+
+
+def retry_db(
+    fn: Callable[[], T],
+    *,
+    idempotent: bool = True,
+    max_retries: int = 4,
+    base: float = 0.2,
+) -> T:
+    """
+    Call fn() (usually a query's bound .execute) and retry transient
+    Supabase failures with jittered exponential backoff.
+
+    Inserts pass idempotent=False: they are only retried when the request
+    certainly never ran, so a lost response can't create duplicate rows.
+    """
+    for attempt in range(max_retries):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries - 1 or not _is_transient(e, idempotent):
+                raise
+            time.sleep(base * (2 ** attempt) + random.random() * 0.1)
@@ -0,0 +1,87 @@
+# modules/forecast_math.py
+from __future__ import annotations
+
+import numpy as np
+
+# numba is optional: without it the kernels below run as plain Python
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# ============================================================
+# Month × product distribution kernels
+# ------------------------------------------------------------
+# Arrays are laid out rows=products, cols=months (same order as
+# month_range). Everything stays float64 and fastmath is deliberately
+# off: these numbers end up summed into money totals and must match the
+# dict-based math (float32 keeps ~7 digits, too few for BDT totals).
+# ============================================================
+
+@njit(cache=True)
+def distribute(qty_arr: np.ndarray, weight_matrix: np.ndarray) -> np.ndarray:
+    """
+    Spread each product's total quantity across months.
+
+    qty_arr:       (P,) total quantity per product
+    weight_matrix: (P, M) raw month weights per product. Negative weights
+                   count as 0; an all-zero row is spread uniformly
+                   (same rules as build_distribution_weights "Custom").
+
+    Returns a (P, M) matrix of quantities.
+    """
+    n_products, n_months = weight_matrix.shape
+    out = np.zeros((n_products, n_months))
+
+    for i in range(n_products):
+        total = 0.0
+        for j in range(n_months):
+            if weight_matrix[i, j] > 0.0:
+                total += weight_matrix[i, j]
+
+        for j in range(n_months):
+            if total == 0.0:
+                w = 1.0 / n_months
+            else:
+                w = max(weight_matrix[i, j], 0.0) / total
+            out[i, j] = qty_arr[i] * w
+
+    return out
+
+
+@njit(cache=True)
+def monthly_economics(
+    qty_matrix: np.ndarray,
+    price: np.ndarray,
+    eff_price: np.ndarray,
+    unit_cost: np.ndarray,
+    unit_profit: np.ndarray,
+):
+    """
+    Money columns for every product-month, in one pass over qty_matrix.
+
+    qty_matrix:  (P, M) quantities from distribute()
+    price, eff_price, unit_cost, unit_profit: (P,) per-unit economics
+
+    Returns (gross_revenue, effective_revenue, total_cost, net_profit),
+    each (P, M).
+    """
+    n_products, n_months = qty_matrix.shape
+    gross = np.empty((n_products, n_months))
+    effective = np.empty((n_products, n_months))
+    cost = np.empty((n_products, n_months))
+    net = np.empty((n_products, n_months))
+
+    for i in range(n_products):
+        for j in range(n_months):
+            q = qty_matrix[i, j]
+            gross[i, j] = price[i] * q
+            effective[i, j] = eff_price[i] * q
+            cost[i, j] = unit_cost[i] * q
+            net[i, j] = unit_profit[i] * q
+
+    return gross, effective, cost, net
@@ -48,6 +48,15 @@ def rows_to_opex_items(rows: List[Dict[str, Any]]) -> List[OpexItem]:
 # -------------------------------------------------
 # Core monthly expansion
 # -------------------------------------------------
+_OPEN_END = 9999 * 12 + 12  # end_month None → open-ended
+
+
+def _month_index(label: str) -> int:
+    """'YYYY-MM' → year*12 + month, so month windows are int compares."""
+    y, m = label.split("-")[:2]
+    return int(y) * 12 + int(m)
+
+
 def expand_opex_for_campaign(
     campaign_start: date,
     campaign_end: date,
@@ -61,39 +70,37 @@ def expand_opex_for_campaign(
     if not camp_months:
         return pd.DataFrame()
 
-    rows = []
-    for item in opex_items:
-        # Determine which months this item applies to
-        start_m = item.start_month
-        end_m = item.end_month or "9999-12"
-
-        for m in camp_months:
-            if not (start_m <= m <= end_m):
-                continue
-
-            if item.is_one_time:
-                # one-time costs apply ONLY at their start_month
-                if m != start_m:
-                    continue
-
-            rows.append({
-                "month": m,
-                "month_nice": month_label_to_nice(m),
-                "opex_id": item.id,
-                "name": item.name,
-                "category": item.category,
-                "cost_bdt": item.cost_bdt,
-                "is_one_time": item.is_one_time,
-                "notes": item.notes
-            })
-
-    df = pd.DataFrame(rows)
+    if not opex_items:
+        return pd.DataFrame()
+
+    items_df = pd.DataFrame({
+        "opex_id": [i.id for i in opex_items],
+        "name": [i.name for i in opex_items],
+        "category": [i.category for i in opex_items],
+        "cost_bdt": [float(i.cost_bdt) for i in opex_items],
+        "is_one_time": [bool(i.is_one_time) for i in opex_items],
+        "notes": [i.notes for i in opex_items],
+        "start_mi": [_month_index(i.start_month) for i in opex_items],
+        "end_mi": [_month_index(i.end_month) if i.end_month else _OPEN_END for i in opex_items],
+    })
+    months_df = pd.DataFrame({
+        "month": camp_months,
+        "month_mi": [_month_index(m) for m in camp_months],
+    })
+
+    # every item × every campaign month, then keep the months each item applies to
+    df = items_df.merge(months_df, how="cross")
+    in_window = (df["start_mi"] <= df["month_mi"]) & (df["month_mi"] <= df["end_mi"])
+    # one-time costs apply ONLY at their start_month
+    one_time_ok = ~df["is_one_time"] | (df["month_mi"] == df["start_mi"])
+    df = df[in_window & one_time_ok]
     if df.empty:
-        return df
+        return pd.DataFrame()
 
-    # aggregate per month for quick charts
-    df["cost_bdt"] = df["cost_bdt"].astype(float)
-    return df
+    df = df.assign(month_nice=df["month"].map(month_label_to_nice))
+    return df[
+        ["month", "month_nice", "opex_id", "name", "category", "cost_bdt", "is_one_time", "notes"]
+    ].reset_index(drop=True)
 
 
 def opex_month_table(opex_df: pd.DataFrame) -> pd.DataFrame:
@@ -2,21 +2,25 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-from modules.db import get_supabase
+from datetime import datetime, timezone
+import streamlit as st
+from modules.db import get_supabase, retry_db
 
 
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
 def now_ts() -> str:
-    return datetime.utcnow().isoformat()
+    return datetime.now(timezone.utc).isoformat()
 
 
 # -------------------------------------------------
 # OPEX master items (global list)
 # Table: opex_items
 # -------------------------------------------------
+# Reads are cached for a short TTL (pages reload them on every rerun);
+# each write clears the matching cache.
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_opex_items(active_only: bool = True) -> List[Dict[str, Any]]:
     supabase = get_supabase()
     q = supabase.table("opex_items").select("*")
@@ -27,42 +31,45 @@ def fetch_opex_items(active_only: bool = True) -> List[Dict[str, Any]]:
             q = q.eq("is_active", True)
         except Exception:
             pass
-    resp = q.order("created_at", desc=True).execute()
+    resp = retry_db(q.order("created_at", desc=True).execute)
     return resp.data or []
 
 
 def insert_opex_item(data: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
-    data["created_at"] = now_ts()
-    data["updated_at"] = now_ts()
-    resp = supabase.table("opex_items").insert(data).execute()
+    data["created_at"] = data["updated_at"] = now_ts()
+    resp = retry_db(supabase.table("opex_items").insert(data).execute, idempotent=False)
+    fetch_opex_items.clear()
     return resp.data[0]
 
 
 def update_opex_item(opex_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
     fields["updated_at"] = now_ts()
-    resp = supabase.table("opex_items").update(fields).eq("id", opex_id).execute()
+    resp = retry_db(supabase.table("opex_items").update(fields).eq("id", opex_id).execute)
+    fetch_opex_items.clear()
     return resp.data[0]
 
 
 def delete_opex_item(opex_id: str) -> None:
     supabase = get_supabase()
-    supabase.table("opex_items").delete().eq("id", opex_id).execute()
+    retry_db(supabase.table("opex_items").delete().eq("id", opex_id).execute)
+    fetch_opex_items.clear()
 
 
 # -------------------------------------------------
 # Campaign linkage
 # Table: campaign_opex
 # -------------------------------------------------
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_campaign_opex_links(campaign_id: str) -> List[str]:
     """Return list of linked opex_ids for a campaign."""
     supabase = get_supabase()
-    resp = (
+    resp = retry_db(
         supabase.table("campaign_opex")
         .select("opex_id")
         .eq("campaign_id", campaign_id)
-        .execute()
+        .execute
     )
     rows = resp.data or []
     return [r["opex_id"] for r in rows]
@@ -75,8 +82,10 @@ def save_campaign_opex_links(campaign_id: str, opex_ids: List[str]) -> None:
       - insert current selection
     """
     supabase = get_supabase()
-    supabase.table("campaign_opex").delete().eq("campaign_id", campaign_id).execute()
+    retry_db(supabase.table("campaign_opex").delete().eq("campaign_id", campaign_id).execute)
 
     payload = [{"campaign_id": campaign_id, "opex_id": oid} for oid in opex_ids]
     if payload:
-        supabase.table("campaign_opex").insert(payload).execute()
+        retry_db(supabase.table("campaign_opex").insert(payload).execute, idempotent=False)
+
+    fetch_campaign_opex_links.clear(campaign_id)
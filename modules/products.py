@@ -3,12 +3,16 @@ from __future__ import annotations
 
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 import uuid
 
 from modules.products_db import (
     db_fetch_products,
+    db_fetch_products_page,
+    db_count_products,
     db_insert_product,
+    db_insert_products,
     db_update_product,
     db_delete_product,
 )
@@ -39,13 +43,26 @@ class Product:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
+    def __post_init__(self):
+        # Per-unit economics are fixed for a row, so work them out once here
+        # instead of on every forecast row. Plain attributes (not fields) so
+        # they stay out of asdict()/repr().
+        self._effective_price = (
+            self.price_bdt * (1 - self.discount_rate) * (1 - self.return_rate)
+        )
+        self._total_unit_cost = (
+            self.manufacturing_cost_bdt +
+            self.packaging_cost_bdt +
+            self.shipping_cost_bdt +
+            self.marketing_cost_bdt
+        )
+        self._unit_net_profit = self._effective_price - self._total_unit_cost
+
 
 # -------------------------------------------------------------
 # Load products (from Supabase)
 # -------------------------------------------------------------
-def load_products() -> List[Product]:
-    rows = db_fetch_products()
-
+def _rows_to_products(rows: List[Dict[str, Any]]) -> List[Product]:
     products = []
     for row in rows:
         # Safety: ensure missing optional fields don't break
@@ -61,32 +78,59 @@ def load_products() -> List[Product]:
     return products
 
 
+def load_products() -> List[Product]:
+    return _rows_to_products(db_fetch_products())
+
+
+def load_products_page(offset: int, limit: int) -> List[Product]:
+    """Products [offset, offset + limit) in catalogue order."""
+    return _rows_to_products(db_fetch_products_page(offset, limit))
+
+
+def count_products() -> int:
+    return db_count_products()
+
+
 # -------------------------------------------------------------
 # Save / Update / Delete
 # -------------------------------------------------------------
-def add_product(products: List[Product], data: Dict[str, Any]) -> List[Product]:
+def _ensure_product_code(data: Dict[str, Any]) -> None:
     # Auto-generate product_code
     if not data.get("product_code"):
         data["product_code"] = (
             data["name"].upper().replace(" ", "-") + "-" + uuid.uuid4().hex[:4]
         )
 
+
+def add_product(products: List[Product], data: Dict[str, Any]) -> List[Product]:
+    _ensure_product_code(data)
+
     new_row = db_insert_product(data)
     products.append(Product(**new_row))
     return products
 
 
+def add_products(products: List[Product], rows: List[Dict[str, Any]]) -> List[Product]:
+    """Same as add_product for several products, saved in a single insert."""
+    for data in rows:
+        _ensure_product_code(data)
+
+    for new_row in db_insert_products(rows):
+        products.append(Product(**new_row))
+    return products
+
+
 def update_product(products: List[Product], product_id: str, updated_data: Dict[str, Any]):
     updated_row = db_update_product(product_id, updated_data)
 
-    new_list = []
-    for p in products:
+    # Swap the edited product in place (same as add_product appending)
+    # instead of rebuilding the whole list
+    for i, p in enumerate(products):
         if p.id == product_id:
-            new_list.append(Product(**updated_row))
-        else:
-            new_list.append(p)
+            products[i] = Product(**updated_row)
+            break
 
-    return new_list
+    return products
 
 
 def delete_product(products: List[Product], product_id: str):
@@ -125,21 +169,14 @@ def validate_product_dict(d: Dict[str, Any]) -> List[str]:
 
 
 # -------------------------------------------------------------
-# Calculations (unchanged)
+# Calculations (cached on the Product in __post_init__)
 # -------------------------------------------------------------
 def effective_price(p: Product) -> float:
-    after_discount = p.price_bdt * (1 - p.discount_rate)
-    realized = after_discount * (1 - p.return_rate)
-    return realized
+    return p._effective_price
 
 
 def total_unit_cost(p: Product) -> float:
-    return (
-        p.manufacturing_cost_bdt +
-        p.packaging_cost_bdt +
-        p.shipping_cost_bdt +
-        p.marketing_cost_bdt
-    )
+    return p._total_unit_cost
 
 
 def unit_gross_profit(p: Product) -> float:
@@ -147,7 +184,7 @@ def unit_gross_profit(p: Product) -> float:
 
 
 def unit_net_profit(p: Product) -> float:
-    return effective_price(p) - total_unit_cost(p)
+    return p._unit_net_profit
 
 
 def gross_margin_pct(p: Product) -> float:
@@ -156,7 +193,8 @@ def gross_margin_pct(p: Product) -> float:
 
 
 def net_margin_pct(p: Product) -> float:
-    denom = effective_price(p) if effective_price(p) else 1
+    ep = effective_price(p)
+    denom = ep if ep else 1
     return unit_net_profit(p) / denom
 
 
@@ -164,39 +202,43 @@ def net_margin_pct(p: Product) -> float:
 # DataFrame for modules
 # -------------------------------------------------------------
 def products_to_dataframe(products: List[Product]) -> pd.DataFrame:
-    rows = []
-    for p in products:
-        ep = effective_price(p)
-        tuc = total_unit_cost(p)
-        ugp = unit_gross_profit(p)
-        unp = unit_net_profit(p)
-
-        rows.append({
-            "id": p.id,
-            "product_code": p.product_code,
-            "name": p.name,
-            "category": p.category,
-
-            "price_bdt": p.price_bdt,
-            "manufacturing_cost_bdt": p.manufacturing_cost_bdt,
-            "packaging_cost_bdt": p.packaging_cost_bdt,
-            "shipping_cost_bdt": p.shipping_cost_bdt,
-            "marketing_cost_bdt": p.marketing_cost_bdt,
-
-            "return_rate_%": p.return_rate * 100,
-            "discount_rate_%": p.discount_rate * 100,
-            "vat_included": p.vat_included,
-
-            "effective_price": ep,
-            "total_unit_cost": tuc,
-            "unit_gross_profit": ugp,
-            "unit_net_profit": unp,
-            "gross_margin_%": gross_margin_pct(p) * 100,
-            "net_margin_%": net_margin_pct(p) * 100,
-
-            "notes": p.notes,
-            "created_at": p.created_at,
-            "updated_at": p.updated_at,
-        })
-
-    return pd.DataFrame(rows)
+    # Built column by column: raw fields are gathered once per column and
+    # the derived economics are computed on whole arrays.
+    def col(attr: str) -> list:
+        return [getattr(p, attr) for p in products]
+
+    price = np.array(col("price_bdt"), dtype=np.float64)
+    mfg = np.array(col("manufacturing_cost_bdt"), dtype=np.float64)
+    ep = np.array([effective_price(p) for p in products], dtype=np.float64)
+    tuc = np.array([total_unit_cost(p) for p in products], dtype=np.float64)
+    unp = np.array([unit_net_profit(p) for p in products], dtype=np.float64)
+    ugp = price - mfg
+
+    return pd.DataFrame({
+        "id": col("id"),
+        "product_code": col("product_code"),
+        "name": col("name"),
+        "category": col("category"),
+
+        "price_bdt": col("price_bdt"),
+        "manufacturing_cost_bdt": col("manufacturing_cost_bdt"),
+        "packaging_cost_bdt": col("packaging_cost_bdt"),
+        "shipping_cost_bdt": col("shipping_cost_bdt"),
+        "marketing_cost_bdt": col("marketing_cost_bdt"),
+
+        "return_rate_%": np.array(col("return_rate"), dtype=np.float64) * 100,
+        "discount_rate_%": np.array(col("discount_rate"), dtype=np.float64) * 100,
+        "vat_included": col("vat_included"),
+
+        "effective_price": ep,
+        "total_unit_cost": tuc,
+        "unit_gross_profit": ugp,
+        "unit_net_profit": unp,
+        # same zero guards as gross_margin_pct / net_margin_pct
+        "gross_margin_%": ugp / np.where(price != 0, price, 1) * 100,
+        "net_margin_%": unp / np.where(ep != 0, ep, 1) * 100,
+
+        "notes": col("notes"),
+        "created_at": col("created_at"),
+        "updated_at": col("updated_at"),
+    })
@@ -1,61 +1,123 @@
 # modules/products_db.py
 from __future__ import annotations
 from typing import List, Dict, Any
-from supabase import Client
 import datetime
-from modules.db import get_supabase
+import streamlit as st
+from modules.db import get_supabase, retry_db
 
 
 # -------------------------------------------
 # Helpers
 # -------------------------------------------
 def now_ts():
-    return datetime.datetime.utcnow().isoformat()
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
 
 
 # -------------------------------------------
 # CRUD wrappers for Supabase "products"
 # -------------------------------------------
 
+# Columns of the Product dataclass (modules/products.py) – the only
+# ones load_products() reads. Keep in sync with the dataclass.
+PRODUCT_COLUMNS = (
+    "id,product_code,name,category,"
+    "price_bdt,manufacturing_cost_bdt,packaging_cost_bdt,shipping_cost_bdt,marketing_cost_bdt,"
+    "return_rate,discount_rate,vat_included,notes,is_active,created_at,updated_at"
+)
+
+
+# Cached for a short TTL: every page loads products on each rerun.
+# All writes below clear these caches.
+@st.cache_data(ttl=60, show_spinner=False)
 def db_fetch_products() -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = (
+    resp = retry_db(
+        supabase.table("products")
+        .select(PRODUCT_COLUMNS)
+        .eq("is_active", True)
+        .order("created_at", desc=False)
+        .execute
+    )
+    return resp.data or []
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def db_fetch_products_page(offset: int, limit: int) -> List[Dict[str, Any]]:
+    """One page of active products (same order as db_fetch_products)."""
+    supabase = get_supabase()
+    resp = retry_db(
         supabase.table("products")
-        .select("*")
+        .select(PRODUCT_COLUMNS)
         .eq("is_active", True)
         .order("created_at", desc=False)
-        .execute()
+        .range(offset, offset + limit - 1)
+        .execute
     )
     return resp.data or []
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def db_count_products() -> int:
+    supabase = get_supabase()
+    resp = retry_db(
+        supabase.table("products")
+        .select("id", count="exact", head=True)
+        .eq("is_active", True)
+        .execute
+    )
+    return resp.count or 0
+
+
+def _clear_product_caches() -> None:
+    db_fetch_products.clear()
+    db_fetch_products_page.clear()
+    db_count_products.clear()
+
+
 def db_insert_product(product_data: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
 
-    product_data["created_at"] = now_ts()
-    product_data["updated_at"] = now_ts()
+    product_data["created_at"] = product_data["updated_at"] = now_ts()
 
-    resp = supabase.table("products").insert(product_data).execute()
+    resp = retry_db(supabase.table("products").insert(product_data).execute, idempotent=False)
+    _clear_product_caches()
     return resp.data[0]
 
 
+def db_insert_products(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert several products in one request (one timestamp for the batch)."""
+    if not rows:
+        return []
+    supabase = get_supabase()
+
+    ts = now_ts()
+    for r in rows:
+        r["created_at"] = r["updated_at"] = ts
+
+    resp = retry_db(supabase.table("products").insert(rows).execute, idempotent=False)
+    _clear_product_caches()
+    return resp.data or []
+
+
 def db_update_product(product_id: str, updated_data: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
 
     updated_data["updated_at"] = now_ts()
 
-    resp = (
+    resp = retry_db(
         supabase.table("products")
         .update(updated_data)
         .eq("id", product_id)
-        .execute()
+        .execute
     )
+    _clear_product_caches()
     return resp.data[0]
 
 
 def db_delete_product(product_id: str) -> None:
     supabase = get_supabase()
-    supabase.table("products").delete().eq("id", product_id).execute()
+    retry_db(supabase.table("products").delete().eq("id", product_id).execute)
+    _clear_product_caches()
 
 # -------------------------------------------
 # Public-friendly alias (for reporting module)
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import date
+from functools import lru_cache
 import calendar
+import numpy as np
 import pandas as pd
 import streamlit as st  # SAFE import for optional currency helpers
 
@@ -13,6 +15,7 @@ from modules.products import (
     total_unit_cost,
     unit_net_profit
 )
+from modules.forecast_math import distribute, monthly_economics
 
 # ============================================================
 # OPTIONAL CURRENCY HELPERS (DISPLAY ONLY)
@@ -34,21 +37,23 @@ def currency_symbol() -> str:
 # -----------------------------
 # Date / Month helpers
 # -----------------------------
-def month_range(start: date, end: date) -> List[str]:
+@lru_cache(maxsize=256)
+def _month_labels(start: date, end: date) -> Tuple[str, ...]:
     if end < start:
         start, end = end, start
 
-    months = []
-    y, m = start.year, start.month
-    while (y < end.year) or (y == end.year and m <= end.month):
-        months.append(f"{y:04d}-{m:02d}")
-        m += 1
-        if m > 12:
-            m = 1
-            y += 1
-    return months
+    return tuple(
+        pd.period_range(pd.Period(start, freq="M"), pd.Period(end, freq="M"), freq="M")
+        .strftime("%Y-%m")
+    )
+
 
+def month_range(start: date, end: date) -> List[str]:
+    # cached per (start, end); callers get their own list to modify
+    return list(_month_labels(start, end))
 
+
+@lru_cache(maxsize=512)
 def month_label_to_nice(label: str) -> str:
     y, m = label.split("-")
     m_int = int(m)
@@ -58,33 +63,41 @@ def month_label_to_nice(label: str) -> str:
 # -----------------------------
 # Distribution Logic
 # -----------------------------
-def build_distribution_weights(
+def distribution_weight_array(
     months: List[str],
     mode: str = "Uniform",
     custom_weights: Optional[Dict[str, float]] = None
-) -> Dict[str, float]:
+) -> np.ndarray:
+    """
+    Normalised month weights as a float64 array aligned with `months`
+    (position i ↔ months[i]), so forecasts can index instead of hashing labels.
+    """
     n = len(months)
     if n == 0:
-        return {}
+        return np.zeros(0)
 
-    if mode == "Uniform":
-        w = [1] * n
-    elif mode == "Front-loaded":
-        w = list(range(n, 0, -1))
+    if mode == "Front-loaded":
+        w = np.arange(n, 0, -1, dtype=np.float64)
     elif mode == "Back-loaded":
-        w = list(range(1, n + 1))
-    elif mode == "Custom":
-        if not custom_weights:
-            w = [1] * n
-        else:
-            w = [max(0.0, float(custom_weights.get(m, 0.0))) for m in months]
-            if sum(w) == 0:
-                w = [1] * n
+        w = np.arange(1, n + 1, dtype=np.float64)
+    elif mode == "Custom" and custom_weights:
+        # fmax: negative (and NaN) weights count as 0
+        w = np.fmax([float(custom_weights.get(m, 0.0)) for m in months], 0.0)
+        if w.sum() == 0:
+            w = np.ones(n)
     else:
-        w = [1] * n
+        # Uniform, Custom without weights, unknown modes
+        w = np.ones(n)
 
-    total = sum(w)
-    return {months[i]: w[i] / total for i in range(n)}
+    return w / w.sum()
+
+
+def build_distribution_weights(
+    months: List[str],
+    mode: str = "Uniform",
+    custom_weights: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    return dict(zip(months, distribution_weight_array(months, mode, custom_weights).tolist()))
 
 
 def distribute_quantity(total_qty: float, weights: Dict[str, float]) -> Dict[str, float]:
@@ -112,6 +125,16 @@ def revenue_for_product_month(product: Product, qty: float) -> Dict[str, float]:
     }
 
 
+SIZE_COLUMNS = [
+    "product_id", "product_name", "size", "qty",
+    "gross_revenue", "effective_revenue", "total_cost", "net_profit",
+]
+SIZE_DTYPES = {
+    c: "float64"
+    for c in ("qty", "gross_revenue", "effective_revenue", "total_cost", "net_profit")
+}
+
+
 def build_campaign_forecast(
     products: List[Product],
     quantities: Dict[str, float],
@@ -125,81 +148,64 @@ def build_campaign_forecast(
 
     months = month_range(start_date, end_date)
 
-    # Base campaign-level weights (used when no per-product override)
-    base_weights = build_distribution_weights(
-        months,
-        mode=distribution_mode,
-        custom_weights=custom_month_weights
-    )
-
-
-    monthly_rows = []
-    size_rows = []
-
     prod_map = {p.id: p for p in products}
+    planned = [(pid, prod_map[pid], total_qty) for pid, total_qty in quantities.items() if pid in prod_map]
 
-    for pid, total_qty in quantities.items():
-        if pid not in prod_map:
-            continue
-
-        p = prod_map[pid]
-
-        # Decide weights for THIS product
-        if (
-            distribution_mode == "Custom"
-            and per_product_month_weights
-            and pid in per_product_month_weights
-        ):
-            this_custom = per_product_month_weights.get(pid, {})
-            weights_for_pid = build_distribution_weights(
-                months,
-                mode="Custom",
-                custom_weights=this_custom
-            )
-        else:
-            # Uniform / Front / Back, or no per-product override
-            weights_for_pid = base_weights
-
-        month_qtys = distribute_quantity(total_qty, weights_for_pid)
-
-
-        if size_breakdown and pid in size_breakdown:
-            sdict = size_breakdown[pid]
-            for size, sqty in sdict.items():
-                econ = revenue_for_product_month(p, sqty)
-                size_rows.append({
-                    "product_id": pid,
-                    "product_name": p.name,
-                    "size": size,
-                    "qty": sqty,
-                    "gross_revenue": econ["gross_revenue"],
-                    "effective_revenue": econ["effective_revenue"],
-                    "total_cost": econ["total_unit_cost"],
-                    "net_profit": econ["net_profit"]
-                })
-
-        for m, q in month_qtys.items():
-            econ = revenue_for_product_month(p, q)
-            monthly_rows.append({
-                "month": m,
-                "month_nice": month_label_to_nice(m),
-                "product_id": pid,
-                "product_name": p.name,
-                "category": p.category,
-                "qty": q,
-
-                # keep BOTH keys for backward compatibility
-                "price_bdt": p.price_bdt,
-                "price": p.price_bdt,
-
-                "effective_price": effective_price(p),
-                "gross_revenue": econ["gross_revenue"],
-                "effective_revenue": econ["effective_revenue"],
-                "total_cost": econ["total_unit_cost"],
-                "net_profit": econ["net_profit"]
-            })
-
-    monthly_df = pd.DataFrame(monthly_rows)
+    # One weight row per product (rows=products, cols=months), starting from
+    # the campaign-level weights (used when no per-product override)
+    weight_matrix = np.tile(
+        distribution_weight_array(months, mode=distribution_mode, custom_weights=custom_month_weights),
+        (len(planned), 1),
+    )
+    if distribution_mode == "Custom" and per_product_month_weights:
+        for i, (pid, _, _) in enumerate(planned):
+            if pid in per_product_month_weights:
+                # raw weights: distribute() clips and normalises them
+                this_custom = per_product_month_weights[pid]
+                weight_matrix[i] = [float(this_custom.get(m, 0.0)) for m in months]
+
+    qty_matrix = distribute(
+        np.array([float(q) for _, _, q in planned], dtype=np.float64),
+        weight_matrix,
+    )
+
+    # Per-product unit economics, computed once and broadcast below
+    plist = [p for _, p, _ in planned]
+    price = np.array([p.price_bdt for p in plist], dtype=np.float64)
+    ep = np.array([effective_price(p) for p in plist], dtype=np.float64)
+    tuc = np.array([total_unit_cost(p) for p in plist], dtype=np.float64)
+    unp = np.array([unit_net_profit(p) for p in plist], dtype=np.float64)
+
+    # Size rows: product index / label / qty columns, economics gathered by index
+    size_idx, size_labels, size_qty = [], [], []
+    if size_breakdown:
+        for i, (pid, _, _) in enumerate(planned):
+            for size, sqty in size_breakdown.get(pid, {}).items():
+                size_idx.append(i)
+                size_labels.append(size)
+                size_qty.append(sqty)
+
+    # Monthly rows (product-major, months in order)
+    n_products, n_months = qty_matrix.shape
+    if n_products and n_months:
+        gross, effective, cost, net = monthly_economics(qty_matrix, price, ep, tuc, unp)
+
+        monthly_df = pd.DataFrame({
+            "month": months * n_products,
+            "month_nice": [month_label_to_nice(m) for m in months] * n_products,
+            "product_id": np.repeat([pid for pid, _, _ in planned], n_months),
+            "product_name": np.repeat([p.name for p in plist], n_months),
+            "category": np.repeat([p.category for p in plist], n_months),
+            "qty": qty_matrix.ravel(),
+            "price_bdt": np.repeat(price, n_months),
+            "effective_price": np.repeat(ep, n_months),
+            "gross_revenue": gross.ravel(),
+            "effective_revenue": effective.ravel(),
+            "total_cost": cost.ravel(),
+            "net_profit": net.ravel()
+        })
+    else:
+        monthly_df = pd.DataFrame()
 
     if monthly_df.empty:
         product_summary_df = pd.DataFrame()
@@ -224,7 +230,20 @@ def build_campaign_forecast(
             / product_summary_df["effective_revenue"].replace(0, 1)
         ) * 100
 
-    size_df = pd.DataFrame(size_rows) if size_rows else pd.DataFrame()
+    if size_idx:
+        sq = np.array(size_qty, dtype=np.float64)
+        size_df = pd.DataFrame({
+            "product_id": [planned[i][0] for i in size_idx],
+            "product_name": [plist[i].name for i in size_idx],
+            "size": size_labels,
+            "qty": sq,
+            "gross_revenue": price[size_idx] * sq,
+            "effective_revenue": ep[size_idx] * sq,
+            "total_cost": tuc[size_idx] * sq,
+            "net_profit": unp[size_idx] * sq,
+        }, columns=SIZE_COLUMNS).astype(SIZE_DTYPES)
+    else:
+        size_df = pd.DataFrame()
     return monthly_df, product_summary_df, size_df
 
 
@@ -238,10 +257,12 @@ def campaign_totals(monthly_df: pd.DataFrame) -> Dict[str, float]:
             "net_profit": 0
         }
 
+    # one reduction over all five columns
+    sums = monthly_df[["qty", "gross_revenue", "effective_revenue", "total_cost", "net_profit"]].sum()
     return {
-        "campaign_qty": float(monthly_df["qty"].sum()),
-        "gross_revenue": float(monthly_df["gross_revenue"].sum()),
-        "effective_revenue": float(monthly_df["effective_revenue"].sum()),
-        "total_cost": float(monthly_df["total_cost"].sum()),
-        "net_profit": float(monthly_df["net_profit"].sum())
+        "campaign_qty": float(sums["qty"]),
+        "gross_revenue": float(sums["gross_revenue"]),
+        "effective_revenue": float(sums["effective_revenue"]),
+        "total_cost": float(sums["total_cost"]),
+        "net_profit": float(sums["net_profit"])
     }
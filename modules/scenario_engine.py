@@ -1,39 +1,41 @@
 # modules/scenario_engine.py
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import partial
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import date
+import numpy as np
 import pandas as pd
+import streamlit as st
+from postgrest.exceptions import APIError
 
 from modules.products import Product
 from modules.revenue import (
     month_range,
     month_label_to_nice,
-    build_distribution_weights,
-    distribute_quantity
+    distribution_weight_array
 )
+from modules.forecast_math import distribute, monthly_economics
 
-from modules.campaign_db import (
-    fetch_campaign_products,
-    fetch_month_weights,
-    fetch_size_breakdown,
-    fetch_product_month_weights,   # NEW
-)
+from modules.campaign_db import fetch_campaign_bundle
+from modules.opex_db import fetch_campaign_opex_links, fetch_opex_items
 
 # NOTE: module_3 opex linkage table name may vary.
 # We'll attempt safe fetch; if missing, overhead=0.
-from modules.db import get_supabase
+from modules.db import get_supabase, retry_db, run_parallel
 
 
 # ============================================================
 # Scenario Product View (allows total cost override)
 # ============================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ScenarioProduct:
     """
     A lightweight product object after override application.
+    Slotted and read-only: built once per product, read on every row.
     """
     id: str
     name: str
@@ -79,12 +81,19 @@ def unit_net_profit(p: ScenarioProduct) -> float:
 # Safe OPEX fetch (campaign-linked)
 # ============================================================
 
+# Table the last lookup found links in (tried first next time), and probe
+# tables that don't exist in this database (never re-probed).
+_OPEX_TABLE_NAME: Optional[str] = None
+_MISSING_OPEX_TABLES: set = set()
+
+
 def _fetch_campaign_opex_items(campaign_id: str) -> List[Dict[str, Any]]:
     """
     Attempts to retrieve OPEX items attached to a campaign.
     If your Module 3 uses a different table name,
     change it here only.
     """
+    global _OPEX_TABLE_NAME
     supabase = get_supabase()
 
     # Most likely table name used in Module 3:
@@ -93,107 +102,120 @@ def _fetch_campaign_opex_items(campaign_id: str) -> List[Dict[str, Any]]:
         "campaign_opex_items",
         "campaign_opex"
     ]
+    if _OPEX_TABLE_NAME:
+        possible_tables.remove(_OPEX_TABLE_NAME)
+        possible_tables.insert(0, _OPEX_TABLE_NAME)
 
     normalized: List[Dict[str, Any]] = []
 
     for t in possible_tables:
+        if t in _MISSING_OPEX_TABLES:
+            continue
+
         try:
-            resp = (
-                supabase.table(t)
-                .select("*")
-                .eq("campaign_id", campaign_id)
-                .execute()
-            )
-        except Exception:
+            if t == "campaign_opex":
+                # Module 3's own table: cached read, cleared when links are saved
+                rows = [{"opex_id": oid} for oid in fetch_campaign_opex_links(campaign_id)]
+            else:
+                resp = retry_db(
+                    supabase.table(t)
+                    .select("*")
+                    .eq("campaign_id", campaign_id)
+                    .execute
+                )
+                rows = resp.data or []
+        except APIError as e:
+            # PGRST205 / 42P01: table doesn't exist, try the next name.
+            # Anything else (auth, network, bad query) is a real error.
+            if e.code not in ("PGRST205", "42P01"):
+                raise
+            _MISSING_OPEX_TABLES.add(t)
             continue
 
-        rows = resp.data or []
         for r in rows:
             oid = r.get("opex_item_id") or r.get("opex_id")
             if oid:
                 normalized.append({"opex_item_id": oid})
 
         if normalized:
+            _OPEX_TABLE_NAME = t
             return normalized
 
     return normalized
 
 
-def _fetch_opex_library_by_ids(ids: List[str]) -> List[Dict[str, Any]]:
-    if not ids:
-        return []
-    supabase = get_supabase()
-    resp = supabase.table("opex_items").select("*").in_("id", ids).execute()
-    return resp.data or []
+def _fetch_attached_opex_items(campaign_id: str) -> List[Dict[str, Any]]:
+    """
+    Library rows of the OPEX items attached to a campaign.
+    The links and the OPEX library don't depend on each other, so both are
+    read together (one round trip on a cold cache instead of two). The
+    library is small and cached by opex_db, so the join happens here.
+    """
+    attached, library = run_parallel(
+        (_fetch_campaign_opex_items, campaign_id),
+        (partial(fetch_opex_items, active_only=False),),
+    )
+    # several links can point at the same library item
+    wanted = {r["opex_item_id"] for r in attached}
+    return [it for it in library if it["id"] in wanted]
 
 
 # ============================================================
 # Apply scenario overrides
 # ============================================================
 
+def _opt_float(v: Any, scale: float = 1.0) -> Optional[float]:
+    return None if v is None else float(v) / scale
+
+
 def apply_product_overrides(
     products: List[Product],
-    overrides: List[Dict[str, Any]]
-) -> Dict[str, ScenarioProduct]:
+    overrides: List[Dict[str, Any]],
+    base_quantities: Dict[str, float]
+) -> Tuple[Dict[str, ScenarioProduct], Dict[str, float]]:
     """
-    Returns map product_id -> ScenarioProduct
+    Returns (map product_id -> ScenarioProduct, quantities).
+    qty_override replaces base campaign qty for that product.
+    Overrides are parsed once; for a repeated product_id the last row wins.
     """
-    ov_map = {o["product_id"]: o for o in overrides}
+    # product_id -> (price, discount 0-1, return 0-1, total cost, qty); None = keep base
+    ov_map = {
+        o["product_id"]: (
+            _opt_float(o.get("price_override")),
+            _opt_float(o.get("discount_override"), 100.0),
+            _opt_float(o.get("return_rate_override"), 100.0),
+            _opt_float(o.get("cost_override")),
+            _opt_float(o.get("qty_override")),
+        )
+        for o in overrides
+    }
+
+    quantities = dict(base_quantities)
+    for pid, (_, _, _, _, qty) in ov_map.items():
+        if qty is not None:
+            quantities[pid] = qty
 
     out = {}
     for p in products:
-        o = ov_map.get(p.id)
-
-        price_bdt = p.price_bdt
-        discount_rate = p.discount_rate
-        return_rate = p.return_rate
-        cost_override_total = None
-
-        if o:
-            if o.get("price_override") is not None:
-                price_bdt = float(o["price_override"])
-
-            if o.get("discount_override") is not None:
-                discount_rate = float(o["discount_override"]) / 100.0
-
-            if o.get("return_rate_override") is not None:
-                return_rate = float(o["return_rate_override"]) / 100.0
-
-            if o.get("cost_override") is not None:
-                cost_override_total = float(o["cost_override"])
+        price, disc, ret, cost, _ = ov_map.get(p.id, (None, None, None, None, None))
 
         out[p.id] = ScenarioProduct(
             id=p.id,
             name=p.name,
             category=p.category,
-            price_bdt=price_bdt,
+            price_bdt=p.price_bdt if price is None else price,
             manufacturing_cost_bdt=p.manufacturing_cost_bdt,
             packaging_cost_bdt=p.packaging_cost_bdt,
             shipping_cost_bdt=p.shipping_cost_bdt,
             marketing_cost_bdt=p.marketing_cost_bdt,
-            return_rate=return_rate,
-            discount_rate=discount_rate,
+            return_rate=p.return_rate if ret is None else ret,
+            discount_rate=p.discount_rate if disc is None else disc,
             vat_included=p.vat_included,
             notes=p.notes,
-            cost_override_total_bdt=cost_override_total
+            cost_override_total_bdt=cost
         )
 
-    return out
-
-
-def apply_quantity_overrides(
-    base_quantities: Dict[str, float],
-    overrides: List[Dict[str, Any]]
-) -> Dict[str, float]:
-    """
-    qty_override replaces base campaign qty for that product.
-    """
-    out = dict(base_quantities)
-    for o in overrides:
-        pid = o["product_id"]
-        if o.get("qty_override") is not None:
-            out[pid] = float(o["qty_override"])
-    return out
+    return out, quantities
 
 
 # ============================================================
@@ -220,126 +242,105 @@ def build_scenario_forecast(
 
     months = month_range(start_date, end_date)
 
-    # pull base campaign inputs
-    base_quantities, _ = fetch_campaign_products(campaign_id)
-
-    # Legacy campaign-level weights (rows where product_id IS NULL)
-    base_weights = fetch_month_weights(campaign_id)
-
-    # NEW: per-product month weights (rows where product_id IS NOT NULL)
-    base_product_weights = fetch_product_month_weights(campaign_id)
-
-    base_sizes = fetch_size_breakdown(campaign_id)
+    # pull base campaign inputs and the attached OPEX items (fetched concurrently):
+    # - base_weights: legacy campaign-level weights (product_id IS NULL)
+    # - base_product_weights: per-product month weights (product_id IS NOT NULL)
+    bundle, lib_items = run_parallel(
+        (fetch_campaign_bundle, campaign_id),
+        (_fetch_attached_opex_items, campaign_id),
+    )
+    base_quantities, base_weights, base_product_weights, _ = bundle  # sizes not used here
+
+    return _scenario_forecast(
+        products,
+        months,
+        distribution_mode,
+        custom_weights_override,
+        base_quantities,
+        base_weights,
+        base_product_weights,
+        lib_items,
+        scenario_product_overrides,
+        scenario_opex_overrides,
+    )
 
 
+# The forecast itself is pure: every DB-backed input is an argument, so the
+# cache key covers the data and a rerun with unchanged inputs is a lookup.
+@st.cache_data(ttl=300, show_spinner=False)
+def _scenario_forecast(
+    products: List[Product],
+    months: List[str],
+    distribution_mode: str,
+    custom_weights_override: Optional[Dict[str, float]],
+    base_quantities: Dict[str, float],
+    base_weights: Dict[str, float],
+    base_product_weights: Dict[str, Dict[str, float]],
+    lib_items: List[Dict[str, Any]],
+    scenario_product_overrides: List[Dict[str, Any]],
+    scenario_opex_overrides: List[Dict[str, Any]],
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, float]]:
     # apply overrides
-    sp_map = apply_product_overrides(products, scenario_product_overrides)
-    quantities = apply_quantity_overrides(base_quantities, scenario_product_overrides)
+    sp_map, quantities = apply_product_overrides(products, scenario_product_overrides, base_quantities)
 
     # weights
     if distribution_mode == "Custom":
         weights_src = custom_weights_override or base_weights or {m: 1.0 for m in months}
-        weights = build_distribution_weights(months, mode="Custom", custom_weights=weights_src)
+        shared_row = distribution_weight_array(months, mode="Custom", custom_weights=weights_src)
     else:
-        weights = build_distribution_weights(months, mode=distribution_mode)
-
-    monthly_rows = []
-    size_rows = []
+        shared_row = distribution_weight_array(months, mode=distribution_mode)
+
+    planned = [(pid, sp_map[pid], total_qty) for pid, total_qty in quantities.items() if pid in sp_map]
+
+    # One weight row per product (rows=products, cols=months). Only
+    # per-product campaign weights differ between products (Custom mode
+    # without a scenario-level override); everyone else shares shared_row.
+    weight_matrix = np.tile(shared_row, (len(planned), 1))
+    per_product = (
+        distribution_mode == "Custom"
+        and not custom_weights_override
+        and base_product_weights
+    )
 
-    for pid, total_qty in quantities.items():
-        if pid not in sp_map:
-            continue
+    if per_product:
+        for i, (pid, _, _) in enumerate(planned):
+            if pid in base_product_weights:
+                # raw weights: distribute() clips and normalises them
+                this_custom = base_product_weights[pid]
+                weight_matrix[i] = [float(this_custom.get(m, 0.0)) for m in months]
 
-        p = sp_map[pid]
-
-        # -------------------------------
-        # Decide weights for THIS product
-        # -------------------------------
-        if distribution_mode == "Custom":
-            if custom_weights_override:
-                # Scenario-level override: same pattern for all products
-                weights_for_pid = build_distribution_weights(
-                    months,
-                    mode="Custom",
-                    custom_weights=custom_weights_override
-                )
-            elif base_product_weights and pid in base_product_weights:
-                # NEW: per-product weights from campaign_month_weights
-                this_custom = base_product_weights.get(pid, {})
-                weights_for_pid = build_distribution_weights(
-                    months,
-                    mode="Custom",
-                    custom_weights=this_custom
-                )
-            elif base_weights:
-                # Fallback: legacy campaign-level weights if present
-                weights_for_pid = build_distribution_weights(
-                    months,
-                    mode="Custom",
-                    custom_weights=base_weights
-                )
-            else:
-                # Fully fallback → equal distribution
-                weights_for_pid = build_distribution_weights(
-                    months,
-                    mode="Custom",
-                    custom_weights={m: 1.0 for m in months}
-                )
-        else:
-            # Uniform / Front-loaded / Back-loaded → same weights for everyone
-            weights_for_pid = build_distribution_weights(
-                months,
-                mode=distribution_mode
-            )
+    qty_matrix = distribute(
+        np.array([float(q) for _, _, q in planned], dtype=np.float64),
+        weight_matrix,
+    )
 
-        month_qtys = distribute_quantity(total_qty, weights_for_pid)
-
-
-        # size breakdown (inherits base unless overridden by qty_override only)
-        if base_sizes and pid in base_sizes:
-            for size, sqty in base_sizes[pid].items():
-                # scale size breakdown if qty overridden
-                # ratio = overridden total / base total
-                base_total = sum(base_sizes[pid].values()) or 1
-                ratio = total_qty / base_total if base_total else 1
-                adj_qty = float(sqty) * ratio
-
-                ep = effective_price(p)
-                tuc = total_unit_cost(p)
-                unp = unit_net_profit(p)
-
-                size_rows.append({
-                    "product_id": pid,
-                    "product_name": p.name,
-                    "size": size,
-                    "qty": adj_qty,
-                    "gross_revenue": p.price_bdt * adj_qty,
-                    "effective_revenue": ep * adj_qty,
-                    "total_cost": tuc * adj_qty,
-                    "net_profit": unp * adj_qty
-                })
-
-        for m, q in month_qtys.items():
-            ep = effective_price(p)
-            tuc = total_unit_cost(p)
-            unp = unit_net_profit(p)
-
-            monthly_rows.append({
-                "month": m,
-                "month_nice": month_label_to_nice(m),
-                "product_id": pid,
-                "product_name": p.name,
-                "category": p.category,
-                "qty": q,
-                "price_bdt": p.price_bdt,
-                "effective_price_bdt": ep,
-                "gross_revenue": p.price_bdt * q,
-                "effective_revenue": ep * q,
-                "total_cost": tuc * q,
-                "net_profit": unp * q
-            })
-
-    monthly_df = pd.DataFrame(monthly_rows)
+    # Monthly rows (product-major, months in order): per-product unit
+    # economics are computed once and broadcast across the months.
+    n_products, n_months = qty_matrix.shape
+    if n_products and n_months:
+        plist = [p for _, p, _ in planned]
+        price = np.array([p.price_bdt for p in plist], dtype=np.float64)
+        ep = np.array([effective_price(p) for p in plist], dtype=np.float64)
+        tuc = np.array([total_unit_cost(p) for p in plist], dtype=np.float64)
+        unp = np.array([unit_net_profit(p) for p in plist], dtype=np.float64)
+        gross, effective, cost, net = monthly_economics(qty_matrix, price, ep, tuc, unp)
+
+        monthly_df = pd.DataFrame({
+            "month": months * n_products,
+            "month_nice": [month_label_to_nice(m) for m in months] * n_products,
+            "product_id": np.repeat([pid for pid, _, _ in planned], n_months),
+            "product_name": np.repeat([p.name for p in plist], n_months),
+            "category": np.repeat([p.category for p in plist], n_months),
+            "qty": qty_matrix.ravel(),
+            "price_bdt": np.repeat(price, n_months),
+            "effective_price_bdt": np.repeat(ep, n_months),
+            "gross_revenue": gross.ravel(),
+            "effective_revenue": effective.ravel(),
+            "total_cost": cost.ravel(),
+            "net_profit": net.ravel()
+        })
+    else:
+        monthly_df = pd.DataFrame()
 
     if monthly_df.empty:
         product_summary_df = pd.DataFrame()
@@ -364,38 +365,45 @@ def build_scenario_forecast(
             / product_summary_df["effective_revenue"].replace(0, 1)
         ) * 100
 
-    totals = {
-        "campaign_qty": float(monthly_df["qty"].sum()) if not monthly_df.empty else 0,
-        "gross_revenue": float(monthly_df["gross_revenue"].sum()) if not monthly_df.empty else 0,
-        "effective_revenue": float(monthly_df["effective_revenue"].sum()) if not monthly_df.empty else 0,
-        "total_cost": float(monthly_df["total_cost"].sum()) if not monthly_df.empty else 0,
-        "net_profit_variable": float(monthly_df["net_profit"].sum()) if not monthly_df.empty else 0,
-    }
+    if monthly_df.empty:
+        totals = {
+            "campaign_qty": 0,
+            "gross_revenue": 0,
+            "effective_revenue": 0,
+            "total_cost": 0,
+            "net_profit_variable": 0,
+        }
+    else:
+        # one reduction over all five columns
+        sums = monthly_df[["qty", "gross_revenue", "effective_revenue", "total_cost", "net_profit"]].sum()
+        totals = {
+            "campaign_qty": float(sums["qty"]),
+            "gross_revenue": float(sums["gross_revenue"]),
+            "effective_revenue": float(sums["effective_revenue"]),
+            "total_cost": float(sums["total_cost"]),
+            "net_profit_variable": float(sums["net_profit"]),
+        }
 
     # ==========================
     # OPEX impact (campaign-linked + scenario overrides)
     # ==========================
     opex_total = 0.0
 
-    # base attached opex items
-    attached = _fetch_campaign_opex_items(campaign_id)
-    attached_ids = [r["opex_item_id"] for r in attached] if attached else []
-    lib_items = _fetch_opex_library_by_ids(attached_ids)
-
     # override map
     ov_map = {o["opex_item_id"]: o for o in scenario_opex_overrides}
 
     # sum OPEX for campaign months
     for it in lib_items:
-        base_cost = float(it["cost_bdt"])
+        # scenario cost override wins over the library cost
+        ov = ov_map.get(it["id"])
+        if ov and ov.get("cost_override") is not None:
+            base_cost = float(ov["cost_override"])
+        else:
+            base_cost = float(it["cost_bdt"])
         is_one_time = bool(it.get("is_one_time", False))
         start_m = it.get("start_month")
         end_m = it.get("end_month")
 
-        # if scenario override exists, replace cost
-        if it["id"] in ov_map and ov_map[it["id"]].get("cost_override") is not None:
-            base_cost = float(ov_map[it["id"]]["cost_override"])
-
         if is_one_time:
             opex_total += base_cost
         else:
@@ -406,9 +414,9 @@ def build_scenario_forecast(
             if end_m is None:
                 end_m = months[-1]
 
-            for m in months:
-                if start_m <= m <= end_m:
-                    opex_total += base_cost
+            # months is sorted, so the overlap is a bisect on each end
+            overlap = bisect_right(months, end_m) - bisect_left(months, start_m)
+            opex_total += base_cost * max(overlap, 0)
 
     totals["opex_total"] = opex_total
     totals["net_profit_after_opex"] = totals["net_profit_variable"] - opex_total
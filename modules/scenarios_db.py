@@ -2,21 +2,33 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-from modules.db import get_supabase
+from datetime import datetime, timezone
+from modules.db import get_supabase, retry_db, run_parallel
 
 
 def now_ts() -> str:
-    return datetime.utcnow().isoformat()
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Columns the planner and forecast actually read. Pass columns="*" where
+# whole rows are needed (copies, exports).
+SCENARIO_COLUMNS = "id,name,description,base_campaign_id"
+SCENARIO_PRODUCT_COLUMNS = (
+    "product_id,price_override,discount_override,"
+    "return_rate_override,cost_override,qty_override"
+)
+SCENARIO_OPEX_COLUMNS = "opex_item_id,cost_override"
+SCENARIO_FX_COLUMNS = "currency,rate"
+SCENARIO_LINK_COLUMNS = "campaign_id"
 
 
 # ============================================================
 # SCENARIOS (High-level CRUD)
 # ============================================================
 
-def fetch_scenarios() -> List[Dict[str, Any]]:
+def fetch_scenarios(columns: str = SCENARIO_COLUMNS) -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = supabase.table("scenarios").select("*").order("created_at", desc=True).execute()
+    resp = retry_db(supabase.table("scenarios").select(columns).order("created_at", desc=True).execute)
     return resp.data or []
 
 
@@ -26,28 +38,29 @@ def create_scenario(
     base_campaign_id: Optional[str] = None
 ) -> Dict[str, Any]:
     supabase = get_supabase()
+    ts = now_ts()
     payload = {
         "name": name,
         "description": description,
         "base_campaign_id": base_campaign_id,
-        "created_at": now_ts(),
-        "updated_at": now_ts()
+        "created_at": ts,
+        "updated_at": ts
     }
-    resp = supabase.table("scenarios").insert(payload).execute()
+    resp = retry_db(supabase.table("scenarios").insert(payload).execute, idempotent=False)
     return resp.data[0]
 
 
 def update_scenario(scenario_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
     supabase = get_supabase()
     fields["updated_at"] = now_ts()
-    resp = supabase.table("scenarios").update(fields).eq("id", scenario_id).execute()
+    resp = retry_db(supabase.table("scenarios").update(fields).eq("id", scenario_id).execute)
     return resp.data[0]
 
 
 def delete_scenario(scenario_id: str) -> None:
     supabase = get_supabase()
     # cascades will delete scenario_products / scenario_opex / scenario_fx / scenario_campaign_links
-    supabase.table("scenarios").delete().eq("id", scenario_id).execute()
+    retry_db(supabase.table("scenarios").delete().eq("id", scenario_id).execute)
 
 
 def duplicate_scenario(scenario_id: str, new_name: str) -> Dict[str, Any]:
@@ -56,8 +69,14 @@ def duplicate_scenario(scenario_id: str, new_name: str) -> Dict[str, Any]:
     """
     supabase = get_supabase()
 
-    # Load base scenario
-    s_resp = supabase.table("scenarios").select("*").eq("id", scenario_id).execute()
+    # Load base scenario and all of its overrides concurrently
+    s_resp, prods, opex, fx, links = run_parallel(
+        (retry_db, supabase.table("scenarios").select("*").eq("id", scenario_id).execute),
+        (fetch_scenario_products, scenario_id, "*"),
+        (fetch_scenario_opex, scenario_id, "*"),
+        (fetch_scenario_fx, scenario_id, "*"),
+        (fetch_scenario_campaign_links, scenario_id, "*"),
+    )
     if not s_resp.data:
         raise ValueError("Scenario not found")
 
@@ -70,66 +89,106 @@ def duplicate_scenario(scenario_id: str, new_name: str) -> Dict[str, Any]:
 
     new_id = new_s["id"]
 
-    # Copy product overrides
-    prods = fetch_scenario_products(scenario_id)
-    if prods:
-        for p in prods:
-            p["scenario_id"] = new_id
-            p.pop("id", None)
-        supabase.table("scenario_products").insert(prods).execute()
-
-    # Copy opex overrides
-    opex = fetch_scenario_opex(scenario_id)
-    if opex:
-        for o in opex:
-            o["scenario_id"] = new_id
-            o.pop("id", None)
-        supabase.table("scenario_opex").insert(opex).execute()
-
-    # Copy FX overrides
-    fx = fetch_scenario_fx(scenario_id)
-    if fx:
-        for f in fx:
-            f["scenario_id"] = new_id
-            f.pop("id", None)
-        supabase.table("scenario_fx").insert(fx).execute()
-
-    # Copy campaign links
-    links = fetch_scenario_campaign_links(scenario_id)
-    if links:
-        for l in links:
-            l["scenario_id"] = new_id
-            l.pop("id", None)
-        supabase.table("scenario_campaign_links").insert(links).execute()
+    # Copy product / opex / FX overrides and campaign links (new ids come
+    # from the DB); the four inserts are independent, so run them together
+    ts = now_ts()  # the copies are new rows: stamp them all with one timestamp
+
+    def _copy(table: str, rows: List[Dict[str, Any]]) -> None:
+        payload = []
+        for r in rows:
+            row = {k: v for k, v in r.items() if k != "id"}
+            row["scenario_id"] = new_id
+            for k in ("created_at", "updated_at"):
+                if k in row:
+                    row[k] = ts
+            payload.append(row)
+        retry_db(supabase.table(table).insert(payload).execute, idempotent=False)
+
+    run_parallel(*[
+        (_copy, table, rows)
+        for table, rows in (
+            ("scenario_products", prods),
+            ("scenario_opex", opex),
+            ("scenario_fx", fx),
+            ("scenario_campaign_links", links),
+        )
+        if rows
+    ])
 
     return new_s
 
 
+# ============================================================
+# Override tables: upsert + prune
+# Each save upserts on (scenario_id, <key>) and then deletes only the
+# rows that are no longer selected. This needs a unique index per table:
+#   create unique index on scenario_products (scenario_id, product_id);
+#   create unique index on scenario_opex (scenario_id, opex_item_id);
+#   create unique index on scenario_fx (scenario_id, currency);
+# Without it (42P10) the table falls back to delete + insert.
+# ============================================================
+
+_NO_UPSERT_TABLES: set = set()
+
+
+def _replace_scenario_rows(
+    table: str,
+    key: str,
+    scenario_id: str,
+    payload: List[Dict[str, Any]]
+) -> None:
+    supabase = get_supabase()
+    # one row per key (the upsert can't touch the same row twice); last wins
+    payload = list({r[key]: r for r in payload}.values())
+
+    if table not in _NO_UPSERT_TABLES:
+        try:
+            if payload:
+                retry_db(
+                    supabase.table(table)
+                    .upsert(payload, on_conflict=f"scenario_id,{key}")
+                    .execute
+                )
+            q = supabase.table(table).delete().eq("scenario_id", scenario_id)
+            if payload:
+                q = q.not_.in_(key, [r[key] for r in payload])
+            retry_db(q.execute)
+            return
+        except Exception as e:
+            if getattr(e, "code", None) != "42P10":
+                raise
+            _NO_UPSERT_TABLES.add(table)
+
+    retry_db(supabase.table(table).delete().eq("scenario_id", scenario_id).execute)
+    if payload:
+        retry_db(supabase.table(table).insert(payload).execute, idempotent=False)
+
+
 # ============================================================
 # SCENARIO CAMPAIGN LINKS
 # ============================================================
 
-def fetch_scenario_campaign_links(scenario_id: str) -> List[Dict[str, Any]]:
+def fetch_scenario_campaign_links(scenario_id: str, columns: str = SCENARIO_LINK_COLUMNS) -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = supabase.table("scenario_campaign_links").select("*").eq("scenario_id", scenario_id).execute()
+    resp = retry_db(supabase.table("scenario_campaign_links").select(columns).eq("scenario_id", scenario_id).execute)
     return resp.data or []
 
 
 def link_scenario_to_campaign(scenario_id: str, campaign_id: str) -> None:
     supabase = get_supabase()
     # keep 1 active link per scenario → delete old, insert new
-    supabase.table("scenario_campaign_links").delete().eq("scenario_id", scenario_id).execute()
+    retry_db(supabase.table("scenario_campaign_links").delete().eq("scenario_id", scenario_id).execute)
     payload = {"scenario_id": scenario_id, "campaign_id": campaign_id}
-    supabase.table("scenario_campaign_links").insert(payload).execute()
+    retry_db(supabase.table("scenario_campaign_links").insert(payload).execute, idempotent=False)
 
 
 # ============================================================
 # SCENARIO PRODUCT OVERRIDES
 # ============================================================
 
-def fetch_scenario_products(scenario_id: str) -> List[Dict[str, Any]]:
+def fetch_scenario_products(scenario_id: str, columns: str = SCENARIO_PRODUCT_COLUMNS) -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = supabase.table("scenario_products").select("*").eq("scenario_id", scenario_id).execute()
+    resp = retry_db(supabase.table("scenario_products").select(columns).eq("scenario_id", scenario_id).execute)
     return resp.data or []
 
 
@@ -140,9 +199,7 @@ def save_scenario_products(
     """
     overwrite all product overrides for that scenario.
     """
-    supabase = get_supabase()
-    supabase.table("scenario_products").delete().eq("scenario_id", scenario_id).execute()
-
+    ts = now_ts()  # one timestamp for the whole batch
     payload = []
     for r in rows:
         payload.append({
@@ -153,65 +210,58 @@ def save_scenario_products(
             "return_rate_override": r.get("return_rate_override"),
             "cost_override": r.get("cost_override"),
             "qty_override": r.get("qty_override"),
-            "created_at": now_ts(),
-            "updated_at": now_ts()
+            "created_at": ts,
+            "updated_at": ts
         })
 
-    if payload:
-        supabase.table("scenario_products").insert(payload).execute()
+    _replace_scenario_rows("scenario_products", "product_id", scenario_id, payload)
 
 
 # ============================================================
 # SCENARIO OPEX OVERRIDES
 # ============================================================
 
-def fetch_scenario_opex(scenario_id: str) -> List[Dict[str, Any]]:
+def fetch_scenario_opex(scenario_id: str, columns: str = SCENARIO_OPEX_COLUMNS) -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = supabase.table("scenario_opex").select("*").eq("scenario_id", scenario_id).execute()
+    resp = retry_db(supabase.table("scenario_opex").select(columns).eq("scenario_id", scenario_id).execute)
     return resp.data or []
 
 
 def save_scenario_opex(scenario_id: str, rows: List[Dict[str, Any]]) -> None:
-    supabase = get_supabase()
-    supabase.table("scenario_opex").delete().eq("scenario_id", scenario_id).execute()
-
+    ts = now_ts()  # one timestamp for the whole batch
     payload = []
     for r in rows:
         payload.append({
             "scenario_id": scenario_id,
             "opex_item_id": r["opex_item_id"],
             "cost_override": r.get("cost_override"),
-            "created_at": now_ts(),
-            "updated_at": now_ts()
+            "created_at": ts,
+            "updated_at": ts
         })
 
-    if payload:
-        supabase.table("scenario_opex").insert(payload).execute()
+    _replace_scenario_rows("scenario_opex", "opex_item_id", scenario_id, payload)
 
 
 # ============================================================
 # SCENARIO FX OVERRIDES
 # ============================================================
 
-def fetch_scenario_fx(scenario_id: str) -> List[Dict[str, Any]]:
+def fetch_scenario_fx(scenario_id: str, columns: str = SCENARIO_FX_COLUMNS) -> List[Dict[str, Any]]:
     supabase = get_supabase()
-    resp = supabase.table("scenario_fx").select("*").eq("scenario_id", scenario_id).execute()
+    resp = retry_db(supabase.table("scenario_fx").select(columns).eq("scenario_id", scenario_id).execute)
     return resp.data or []
 
 
 def save_scenario_fx(scenario_id: str, rows: List[Dict[str, Any]]) -> None:
-    supabase = get_supabase()
-    supabase.table("scenario_fx").delete().eq("scenario_id", scenario_id).execute()
-
+    ts = now_ts()  # one timestamp for the whole batch
     payload = []
     for r in rows:
         payload.append({
             "scenario_id": scenario_id,
             "currency": r["currency"],
             "rate": float(r["rate"]),
-            "created_at": now_ts(),
-            "updated_at": now_ts()
+            "created_at": ts,
+            "updated_at": ts
         })
 
-    if payload:
-        supabase.table("scenario_fx").insert(payload).execute()
+    _replace_scenario_rows("scenario_fx", "currency", scenario_id, payload)
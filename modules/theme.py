@@ -0,0 +1,286 @@
+# modules/theme.py
+from __future__ import annotations
+
+# =========================================================
+# Shared CSS for the Streamlit pages
+# ---------------------------------------------------------
+# Kept as module-level constants: page scripts are re-executed on every
+# rerun, imported modules are not, so the strings are built once per
+# process. They still have to be emitted on every rerun — Streamlit drops
+# any element that is not re-rendered, so the <style> block cannot be
+# injected "once per session".
+# =========================================================
+
+
+def _style(*blocks: str) -> str:
+    """Join CSS blocks into one <style> element."""
+    return "<style>\n" + "".join(b.lstrip("\n") for b in blocks) + "</style>\n"
+
+
+HOME_CSS = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&display=swap');
+:root {
+    --bg: #0b0c10;
+    --panel: #0f1119;
+    --border: #1d2230;
+    --text: #e9edf5;
+    --muted: #9ea5b4;
+    --accent: #3dd598;
+    --accent-2: #7dd3fc;
+}
+html, body, [class*="css"] {
+    background: var(--bg);
+    color: var(--text);
+    font-family: 'Space Grotesk', system-ui, -apple-system, sans-serif;
+}
+.main { background: var(--bg); }
+.hero {
+    background: radial-gradient(circle at 20% 20%, rgba(61,213,152,0.12), transparent 30%),
+                radial-gradient(circle at 80% 0%, rgba(125,211,252,0.16), transparent 26%),
+                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
+    border: 1px solid var(--border);
+    border-radius: 18px;
+    padding: 30px 28px;
+    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
+    margin-bottom: 20px;
+}
+.hero h1 { margin: 0; font-size: 32px; letter-spacing: -0.4px; }
+.hero p { margin-top: 10px; color: var(--muted); font-size: 16px; line-height: 1.6; }
+.pill {
+    display: inline-block;
+    padding: 6px 12px;
+    border-radius: 999px;
+    background: rgba(61,213,152,0.12);
+    border: 1px solid rgba(61,213,152,0.25);
+    color: var(--accent);
+    font-size: 12px;
+    letter-spacing: 0.4px;
+    text-transform: uppercase;
+}
+.card-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(260px, 1fr));
+    gap: 22px;
+    margin-top: 12px;
+    margin-bottom: 8px;
+}
+.card {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 16px 18px;
+    box-shadow: 0 16px 45px rgba(0,0,0,0.35);
+    transition: all 0.2s ease;
+}
+.card:hover { border-color: var(--accent); transform: translateY(-3px); }
+.card h3 { margin: 0 0 6px 0; font-size: 18px; }
+.card p { margin: 0; color: var(--muted); line-height: 1.5; }
+.metric {
+    background: linear-gradient(120deg, rgba(61,213,152,0.12), rgba(125,211,252,0.12));
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 14px 16px;
+}
+.metric-label { color: var(--muted); font-size: 12px; letter-spacing: 0.6px; text-transform: uppercase; }
+.metric-value { color: var(--text); font-size: 24px; font-weight: 700; }
+</style>
+"""
+
+
+# =========================================================
+# Building blocks shared by the pages/ scripts
+# =========================================================
+
+# Fonts, palette, typography
+_BASE = """
+@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
+:root {
+    --bg: #0b0c10;
+    --panel: #0f1119;
+    --border: #1f2533;
+    --text: #e8ecf3;
+    --muted: #9ea5b4;
+    --accent: #3dd598;
+    --accent-2: #7dd3fc;
+}
+html, body, [class*="css"] {
+    background: var(--bg);
+    color: var(--text);
+    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
+}
+.main { background: var(--bg); }
+h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
+"""
+
+_PANEL = """
+.panel {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 14px 16px;
+}
+"""
+
+_PILL = """
+.pill {
+    display: inline-block;
+    padding: 6px 12px;
+    border-radius: 999px;
+    background: rgba(61,213,152,0.12);
+    border: 1px solid rgba(61,213,152,0.25);
+    color: var(--accent);
+    font-size: 12px;
+    letter-spacing: 0.4px;
+    text-transform: uppercase;
+}
+"""
+
+# Dataframes / tables
+_TABLES = """
+.stDataFrame {
+    border-radius: 12px;
+    overflow: hidden;
+    background: var(--panel);
+}
+thead tr th {
+    background: #141923 !important;
+    color: var(--text) !important;
+    font-weight: 600 !important;
+}
+tbody tr td { color: var(--muted) !important; }
+"""
+
+# Plotly text on the dark background
+_PLOTLY = """
+.js-plotly-plot .plotly-title,
+.js-plotly-plot .legend text,
+.js-plotly-plot .xtick text,
+.js-plotly-plot .ytick text { fill: var(--text) !important; }
+"""
+
+# Page header
+_HERO = """
+.hero {
+    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
+                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
+                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
+    border: 1px solid var(--border);
+    border-radius: 18px;
+    padding: 26px 24px;
+    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
+    margin-bottom: 16px;
+}
+.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
+.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
+"""
+
+# Tabs wrapped in .tab-container
+_TABS = """
+.tab-container [role="tablist"] button {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 12px 12px 0 0;
+    color: var(--text);
+}
+.tab-container [role="tablist"] button[aria-selected="true"] {
+    border-bottom: 2px solid var(--accent);
+    color: var(--accent);
+}
+"""
+
+# Product Management
+_SECTION_CARD = """
+.section-card {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 18px 20px;
+    box-shadow: 0 18px 60px rgba(0,0,0,0.42);
+}
+"""
+
+_BUTTONS = """
+button, .stButton > button {
+    border-radius: 10px !important;
+    font-weight: 600 !important;
+}
+button[kind="primary"], .stButton button[kind="primary"] {
+    background: linear-gradient(120deg, var(--accent), var(--accent-2)) !important;
+    color: #0b0c10 !important;
+    border: none !important;
+}
+"""
+
+_STAT_GRID = """
+.stat-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+    gap: 12px;
+    margin: 12px 0 6px 0;
+}
+.stat-card {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 14px 16px;
+}
+.stat-label { color: var(--muted); font-size: 12px; letter-spacing: 0.6px; text-transform: uppercase; }
+.stat-value { color: var(--text); font-size: 20px; font-weight: 700; }
+"""
+
+_PANEL_INLINE = """
+.panel-inline {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 14px 16px;
+}
+"""
+
+# Reports & Exports
+_SECTION = """
+.section {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 14px;
+    padding: 14px 16px;
+    margin-bottom: 12px;
+}
+"""
+
+# =========================================================
+# Per-page stylesheets
+# =========================================================
+
+PRODUCTS_CSS = _style(
+    _BASE, _SECTION_CARD, _PILL, _TABLES, _BUTTONS, _HERO, _STAT_GRID, _PANEL_INLINE
+)
+
+# Forecast Dashboard uses a slightly lighter panel colour
+FORECAST_CSS = _style(
+    _BASE, ":root { --panel: #11141b; }\n", _PANEL, _PILL, _TABLES, _PLOTLY, _HERO
+)
+
+# OPEX & Profitability, Scenario Planning
+DASHBOARD_CSS = _style(_BASE, _PANEL, _PILL, _TABLES, _PLOTLY, _HERO, _TABS)
+
+SETTINGS_CSS = _style(_BASE, _PANEL, _PILL, _HERO)
+
+REPORTS_CSS = _style(_BASE, _PANEL, _PILL, _HERO, _SECTION)
+
+# =========================================================
+# Plotly chart styling (dark background to match the CSS)
+# ---------------------------------------------------------
+# Use as fig.update_layout(**DARK_LAYOUT, height=..., yaxis_title=...).
+# =========================================================
+
+CHART_BG = "#0f1119"
+CHART_PALETTE = ["#4BA3FF", "#2EE6D6", "#1F8BAE", "#7C5CFF", "#FF6B6B", "#FFC857"]
+
+DARK_LAYOUT = dict(
+    plot_bgcolor=CHART_BG,
+    paper_bgcolor=CHART_BG,
+    font_color="#e6edf3",
+    legend=dict(font=dict(color="#e6edf3")),
+)
@@ -1,11 +1,17 @@
 # pages/1_Product_Management.py
+import math
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from modules.theme import PRODUCTS_CSS, CHART_PALETTE, DARK_LAYOUT
 from modules.products import (
     load_products,
+    load_products_page,
+    count_products,
     add_product,
+    add_products,
     update_product,
     delete_product,
     validate_product_dict,
@@ -17,110 +23,7 @@ st.set_page_config(page_title="Product Management", page_icon="📦", layout="wi
 # =========================================
 # Polished minimal styling
 # =========================================
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #0f1119;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.section-card {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 18px 20px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.42);
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.stDataFrame {
-    border-radius: 12px;
-    overflow: hidden;
-    background: var(--panel);
-}
-thead tr th {
-    background: #141923 !important;
-    color: var(--text) !important;
-    font-weight: 600 !important;
-}
-tbody tr td { color: var(--muted) !important; }
-button, .stButton > button {
-    border-radius: 10px !important;
-    font-weight: 600 !important;
-}
-button[kind="primary"], .stButton button[kind="primary"] {
-    background: linear-gradient(120deg, var(--accent), var(--accent-2)) !important;
-    color: #0b0c10 !important;
-    border: none !important;
-}
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-.stat-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-    gap: 12px;
-    margin: 12px 0 6px 0;
-}
-.stat-card {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.stat-label { color: var(--muted); font-size: 12px; letter-spacing: 0.6px; text-transform: uppercase; }
-.stat-value { color: var(--text); font-size: 20px; font-weight: 700; }
-.panel-inline {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.tab-container [role="tablist"] button {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 12px 12px 0 0;
-    color: var(--text);
-}
-.tab-container [role="tablist"] button[aria-selected="true"] {
-    border-bottom: 2px solid var(--accent);
-    color: var(--accent);
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(PRODUCTS_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -142,6 +45,9 @@ if "currency" not in st.session_state:
 if "exchange_rates" not in st.session_state:
     st.session_state.exchange_rates = {"BDT": 1.0, "USD": 117.0, "GBP": 146.0}
 
+# Products added with "Queue for batch save", not yet written
+st.session_state.setdefault("_pending_products", [])
+
 CURRENCY_SYMBOLS = {"BDT": "৳", "USD": "$", "GBP": "£"}
 
 
@@ -151,16 +57,96 @@ def currency_symbol():
 
 def to_bdt(amount_display: float) -> float:
     """Convert display currency -> BDT for storage."""
-    rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
     return float(amount_display) * rate
 
 
 def from_bdt(amount_bdt: float) -> float:
     """Convert BDT -> display currency for UI."""
-    rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
     return float(amount_bdt) / rate
 
 
+# -----------------------------
+# Cached table / chart builders
+# -----------------------------
+# Every widget interaction reruns the page; these memoise the catalogue
+# frames and charts on their inputs (product values, currency) so reruns
+# reuse them.
+@st.cache_data(show_spinner=False)
+def products_df(products) -> pd.DataFrame:
+    return products_to_dataframe(products)
+
+
+# Catalogue table: money columns (converted to the display currency),
+# technical fields left out, and labels ("{sym}" = currency symbol)
+MONEY_COLUMNS = [
+    "price_bdt",
+    "manufacturing_cost_bdt",
+    "packaging_cost_bdt",
+    "shipping_cost_bdt",
+    "marketing_cost_bdt",
+    "effective_price",
+    "total_unit_cost",
+    "unit_gross_profit",
+    "unit_net_profit",
+]
+HIDDEN_COLUMNS = {"id", "created_at", "updated_at"}
+DISPLAY_LABELS = {
+    # ID & code
+    "id": "ID",
+    "product_code": "Product Code",
+    # Text fields
+    "name": "Product Name",
+    "category": "Category",
+    "notes": "Notes",
+    # Costs & prices with currency symbol
+    "price_bdt": "Price ({sym})",
+    "manufacturing_cost_bdt": "Manufacturing Cost ({sym})",
+    "packaging_cost_bdt": "Packaging Cost ({sym})",
+    "shipping_cost_bdt": "Shipping Cost ({sym})",
+    "marketing_cost_bdt": "Marketing Cost ({sym})",
+    # Profit & cost calculations
+    "effective_price": "Effective Price ({sym})",
+    "total_unit_cost": "Total Unit Cost ({sym})",
+    "unit_gross_profit": "Gross Profit / Unit ({sym})",
+    "unit_net_profit": "Net Profit / Unit ({sym})",
+    # Percentage fields
+    "return_rate_%": "Return Rate (%)",
+    "discount_rate_%": "Discount Rate (%)",
+    "net_margin_%": "Net Margin (%)",
+    # Flags
+    "vat_included": "VAT Included?",
+}
+
+
+@st.cache_data(show_spinner=False)
+def display_products_df(df_bdt: pd.DataFrame, sym: str, rate: float) -> pd.DataFrame:
+    """Catalogue table in display currency, technical fields dropped, columns labelled."""
+    # assembled column by column in one pass: no copy / drop / rename frames
+    cols = {}
+    for c in df_bdt.columns:
+        if c in HIDDEN_COLUMNS:
+            continue
+        values = df_bdt[c].to_numpy(dtype="float64") / rate if c in MONEY_COLUMNS else df_bdt[c]
+        cols[DISPLAY_LABELS.get(c, c).format(sym=sym)] = values
+    return pd.DataFrame(cols, index=df_bdt.index)
+
+
+@st.cache_data(show_spinner=False)
+def catalogue_bar_chart(df: pd.DataFrame, y: str, title: str, text_auto: str, sym: str):
+    """Profitability bar chart for tab 1 (one bar per product, coloured by category)."""
+    fig = px.bar(
+        df,
+        x="Product Name",
+        y=y,
+        color="Category",
+        title=title,
+        text_auto=text_auto,
+        color_discrete_sequence=CHART_PALETTE,
+    )
+    fig.update_layout(**DARK_LAYOUT, height=420, yaxis_title=sym)
+    return fig
+
+
 # -----------------------------
 # Sidebar: Currency selector
 # -----------------------------
@@ -180,6 +166,22 @@ with st.sidebar:
         f"1 GBP = {st.session_state.exchange_rates['GBP']} BDT"
     )
 
+    st.header("Display")
+    display_limit = int(
+        st.number_input(
+            "Rows per page",
+            min_value=10,
+            max_value=5000,
+            value=50,
+            step=10,
+            help="Catalogue rows fetched and shown at a time; large tables are slow to send to the browser.",
+        )
+    )
+
+# Display currency, resolved once per rerun (only the sidebar changes it)
+sym = currency_symbol()
+rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
+
 # =====================================================
 # Tooltips — Bangladesh context
 # =====================================================
@@ -195,344 +197,326 @@ HELP_DISCOUNT = "Expected average discount during campaign — launch offers, in
 HELP_VAT = "If ON, selling price includes VAT. Bangladesh standard VAT ~15% for apparel (may vary)."
 HELP_CODE = "Optional internal code e.g., TSHIRT-001. Useful for SKUs and reporting. If empty, system generates one."
 
+# Starting values for the add form (display currency, rates as 0-1)
+NEW_PRODUCT_DEFAULTS = {
+    "product_code": "",
+    "name": "",
+    "category": "",
+    "notes": "",
+    "price": 2000.0,
+    "manufacturing_cost": 800.0,
+    "packaging_cost": 100.0,
+    "shipping_cost": 150.0,
+    "marketing_cost": 120.0,
+    "return_rate": 0.05,
+    "discount_rate": 0.10,
+    "vat_included": True,
+}
+
+
 # -----------------------------
-# Load products from Supabase
+# Shared product form
 # -----------------------------
-products = load_products()
+def render_product_form(defaults: dict) -> dict:
+    """
+    Render the product fields inside the caller's st.form and return them
+    as a product dict ready for validate_product_dict (money in BDT).
+
+    defaults: widget starting values, money in the display currency and
+              rates as fractions (see NEW_PRODUCT_DEFAULTS).
+    """
+    colA, colB, colC = st.columns(3)
+
+    with colA:
+        product_code = st.text_input(
+            "Product Code (optional)",
+            value=defaults["product_code"],
+            placeholder="e.g., TSHIRT-001",
+            help=HELP_CODE,
+        )
+        name = st.text_input(
+            "Product Name*",
+            value=defaults["name"],
+            placeholder="e.g., Premium T-Shirt",
+            help=HELP_PRODUCT_NAME,
+        )
+        category = st.text_input(
+            "Category*", value=defaults["category"], placeholder="e.g., Tops", help=HELP_CATEGORY
+        )
+        notes = st.text_area(
+            "Notes (optional)", value=defaults["notes"], placeholder="Anything helpful for the team"
+        )
+
+    with colB:
+        price = st.number_input(
+            f"Selling Price ({sym})*",
+            min_value=0.0,
+            value=float(defaults["price"]),
+            step=50.0,
+            help=HELP_PRICE,
+        )
+        manufacturing_cost = st.number_input(
+            f"Manufacturing Cost ({sym})*",
+            min_value=0.0,
+            value=float(defaults["manufacturing_cost"]),
+            step=25.0,
+            help=HELP_MANUFACTURING,
+        )
+        packaging_cost = st.number_input(
+            f"Packaging Cost ({sym})",
+            min_value=0.0,
+            value=float(defaults["packaging_cost"]),
+            step=10.0,
+            help=HELP_PACKAGING,
+        )
+
+    with colC:
+        shipping_cost = st.number_input(
+            f"Shipping Cost ({sym})",
+            min_value=0.0,
+            value=float(defaults["shipping_cost"]),
+            step=10.0,
+            help=HELP_SHIPPING,
+        )
+        marketing_cost = st.number_input(
+            f"Marketing Cost per Unit ({sym})",
+            min_value=0.0,
+            value=float(defaults["marketing_cost"]),
+            step=10.0,
+            help=HELP_MARKETING,
+        )
+        return_rate = (
+            st.slider(
+                "Expected Return Rate (%)",
+                0.0,
+                50.0,
+                float(defaults["return_rate"] * 100),
+                0.5,
+                help=HELP_RETURN_RATE,
+            )
+            / 100.0
+        )
+        discount_rate = (
+            st.slider(
+                "Discount / Promo Rate (%)",
+                0.0,
+                80.0,
+                float(defaults["discount_rate"] * 100),
+                0.5,
+                help=HELP_DISCOUNT,
+            )
+            / 100.0
+        )
+        vat_included = st.toggle(
+            "VAT Included in price?", value=bool(defaults["vat_included"]), help=HELP_VAT
+        )
+
+    return {
+        "product_code": product_code.strip() or None,
+        "name": name.strip(),
+        "category": category.strip(),
+        # Convert to BDT for storage (DB)
+        "price_bdt": to_bdt(price),
+        "manufacturing_cost_bdt": to_bdt(manufacturing_cost),
+        "packaging_cost_bdt": to_bdt(packaging_cost),
+        "shipping_cost_bdt": to_bdt(shipping_cost),
+        "marketing_cost_bdt": to_bdt(marketing_cost),
+        "return_rate": float(return_rate),
+        "discount_rate": float(discount_rate),
+        "vat_included": bool(vat_included),
+        "notes": notes.strip(),
+    }
+
+
+def product_unchanged(updated: dict, current) -> bool:
+    """
+    True when the form values match the stored Product, so "Save Changes"
+    can skip the write. Floats are compared with a tolerance because money
+    goes through from_bdt/to_bdt and rates through the % sliders.
+    """
+    for key, new in updated.items():
+        old = getattr(current, key)
+        if isinstance(new, float):
+            if old is None or not math.isclose(new, float(old), rel_tol=1e-9, abs_tol=1e-9):
+                return False
+        elif isinstance(new, bool):
+            if new != bool(old):
+                return False
+        elif (new or "") != (old or ""):
+            return False
+    return True
+
 
 # -----------------------------
-# Layout tabs
+# Layout sections
 # -----------------------------
-st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-tab1, tab2, tab3 = st.tabs(["Products", "Add Product", "Edit / Delete"])
-st.markdown('</div>', unsafe_allow_html=True)
+# A radio instead of st.tabs: tabs run every block on each rerun, while
+# this only renders the visible section (no charts while adding a product).
+active_tab = st.radio(
+    "Section",
+    ["Products", "Add Product", "Edit / Delete"],
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed",
+)
 
 # -----------------------------
-# TAB 1: Table + quick charts
+# SECTION: Table + quick charts
 # -----------------------------
-with tab1:
-    df_bdt = products_to_dataframe(products)
-
+if active_tab == "Products":
     st.subheader("Current Product Catalogue")
-    if df_bdt.empty:
+    # Server-side pagination: only the current page is fetched and sent
+    total = count_products()
+    if total == 0:
         st.warning("No products yet. Add your first one in the next tab.")
     else:
-        # Convert money columns for display
-        df = df_bdt.copy()
-        money_cols = [
-            "price_bdt",
-            "manufacturing_cost_bdt",
-            "packaging_cost_bdt",
-            "shipping_cost_bdt",
-            "marketing_cost_bdt",
-            "effective_price",
-            "total_unit_cost",
-            "unit_gross_profit",
-            "unit_net_profit",
-        ]
-        for c in money_cols:
-            if c in df.columns:
-                df[c] = df[c].apply(from_bdt)
-
-        sym = currency_symbol()
-        # NEW: Drop technical fields
-        drop_cols = ["id", "created_at", "updated_at"]
-        df = df.drop(columns=[c for c in drop_cols if c in df.columns])
-        # Rename visible columns with currency symbol
-        df = df.rename(
-            columns={
-                # ID & code
-                "id": "ID",
-                "product_code": "Product Code",
-                # Text fields
-                "name": "Product Name",
-                "category": "Category",
-                "notes": "Notes",
-                # Costs & prices with currency symbol
-                "price_bdt": f"Price ({sym})",
-                "manufacturing_cost_bdt": f"Manufacturing Cost ({sym})",
-                "packaging_cost_bdt": f"Packaging Cost ({sym})",
-                "shipping_cost_bdt": f"Shipping Cost ({sym})",
-                "marketing_cost_bdt": f"Marketing Cost ({sym})",
-                # Profit & cost calculations
-                "effective_price": f"Effective Price ({sym})",
-                "total_unit_cost": f"Total Unit Cost ({sym})",
-                "unit_gross_profit": f"Gross Profit / Unit ({sym})",
-                "unit_net_profit": f"Net Profit / Unit ({sym})",
-                # Percentage fields
-                "return_rate_%": "Return Rate (%)",
-                "discount_rate_%": "Discount Rate (%)",
-                "net_margin_%": "Net Margin (%)",
-                # Flags
-                "vat_included": "VAT Included?",
-            }
-        )
-
+        n_pages = -(-total // display_limit)
+        page = 1
+        if n_pages > 1:
+            page = int(st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1))
+        offset = (page - 1) * display_limit
+
+        df_bdt = products_df(load_products_page(offset, display_limit))
+        df_view = display_products_df(df_bdt, sym, rate)
         with st.container():
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.dataframe(df_view, use_container_width=True, hide_index=True)
+        if n_pages > 1:
+            st.caption(f"Products {offset + 1}–{offset + len(df_view)} of {total} (page {page} of {n_pages}).")
 
         st.subheader("Profitability Snapshot")
         c1, c2 = st.columns(2)
 
-        chart_bg = "#0f1119"
-        palette = ["#4BA3FF", "#2EE6D6", "#1F8BAE", "#7C5CFF", "#FF6B6B", "#FFC857"]
-
         with c1:
-            fig = px.bar(
-                df,
-                x="Product Name",
-                y=f"Net Profit / Unit ({sym})",
-                color="Category",
-                title=f"Unit Net Profit by Product ({sym})",
-                text_auto=".2f",
-                color_discrete_sequence=palette,
-            )
-            fig.update_layout(
-                height=420,
-                yaxis_title=sym,
-                plot_bgcolor=chart_bg,
-                paper_bgcolor=chart_bg,
-                font_color="#e6edf3",
-                legend=dict(font=dict(color="#e6edf3")),
+            fig = catalogue_bar_chart(
+                df_view[["Product Name", "Category", f"Net Profit / Unit ({sym})"]],
+                f"Net Profit / Unit ({sym})",
+                f"Unit Net Profit by Product ({sym})",
+                ".2f",
+                sym,
             )
-
             st.plotly_chart(fig, use_container_width=True)
 
         with c2:
-            fig2 = px.bar(
-                df,
-                x="Product Name",
-                y="Net Margin (%)",
-                color="Category",
-                title="Net Margin % by Product",
-                text_auto=".1f",
-                color_discrete_sequence=palette,
-            )
-            fig2.update_layout(
-                height=420,
-                yaxis_title=sym,
-                plot_bgcolor=chart_bg,
-                paper_bgcolor=chart_bg,
-                font_color="#e6edf3",
-                legend=dict(font=dict(color="#e6edf3")),
+            fig2 = catalogue_bar_chart(
+                df_view[["Product Name", "Category", "Net Margin (%)"]],
+                "Net Margin (%)",
+                "Net Margin % by Product",
+                ".1f",
+                sym,
             )
-
             st.plotly_chart(fig2, use_container_width=True)
 
     st.divider()
     st.info("Products are auto-saved in Supabase. No manual save needed.")
 
 # -----------------------------
-# TAB 2: Add product form
+# SECTION: Add product form
 # -----------------------------
-with tab2:
+elif active_tab == "Add Product":
     st.subheader("Add a New Product")
-    sym = currency_symbol()
+    products = load_products()
 
     with st.form("add_product_form", clear_on_submit=True):
-        colA, colB, colC = st.columns(3)
+        new_dict = render_product_form(NEW_PRODUCT_DEFAULTS)
+        new_dict["is_active"] = True
 
-        with colA:
-            product_code = st.text_input(
-                "Product Code (optional)", placeholder="e.g., TSHIRT-001", help=HELP_CODE
-            )
-            name = st.text_input(
-                "Product Name*", placeholder="e.g., Premium T-Shirt", help=HELP_PRODUCT_NAME
-            )
-            category = st.text_input("Category*", placeholder="e.g., Tops", help=HELP_CATEGORY)
-            notes = st.text_area("Notes (optional)", placeholder="Anything helpful for the team")
-
-        with colB:
-            price = st.number_input(
-                f"Selling Price ({sym})*",
-                min_value=0.0,
-                value=2000.0,
-                step=50.0,
-                help=HELP_PRICE,
-            )
-            manufacturing_cost = st.number_input(
-                f"Manufacturing Cost ({sym})*",
-                min_value=0.0,
-                value=800.0,
-                step=25.0,
-                help=HELP_MANUFACTURING,
-            )
-            packaging_cost = st.number_input(
-                f"Packaging Cost ({sym})", min_value=0.0, value=100.0, step=10.0, help=HELP_PACKAGING
-            )
-
-        with colC:
-            shipping_cost = st.number_input(
-                f"Shipping Cost ({sym})", min_value=0.0, value=150.0, step=10.0, help=HELP_SHIPPING
-            )
-            marketing_cost = st.number_input(
-                f"Marketing Cost per Unit ({sym})",
-                min_value=0.0,
-                value=120.0,
-                step=10.0,
-                help=HELP_MARKETING,
-            )
-            return_rate = st.slider(
-                "Expected Return Rate (%)", 0.0, 50.0, 5.0, 0.5, help=HELP_RETURN_RATE
-            ) / 100.0
-            discount_rate = st.slider(
-                "Discount / Promo Rate (%)", 0.0, 80.0, 10.0, 0.5, help=HELP_DISCOUNT
-            ) / 100.0
-            vat_included = st.toggle("VAT Included in price?", value=True, help=HELP_VAT)
-
-        submitted = st.form_submit_button("Add Product")
-
-        if submitted:
-            new_dict = {
-                "product_code": product_code.strip() or None,
-                "name": name.strip(),
-                "category": category.strip(),
-                # Convert to BDT for storage (DB)
-                "price_bdt": to_bdt(price),
-                "manufacturing_cost_bdt": to_bdt(manufacturing_cost),
-                "packaging_cost_bdt": to_bdt(packaging_cost),
-                "shipping_cost_bdt": to_bdt(shipping_cost),
-                "marketing_cost_bdt": to_bdt(marketing_cost),
-                "return_rate": float(return_rate),
-                "discount_rate": float(discount_rate),
-                "vat_included": bool(vat_included),
-                "notes": notes.strip(),
-                "is_active": True,
-            }
+        col_add, col_queue = st.columns([1, 1])
+        submitted = col_add.form_submit_button("Add Product")
+        queued = col_queue.form_submit_button("Queue for batch save")
 
+        if submitted or queued:
             errors = validate_product_dict(new_dict)
             if errors:
                 st.error("Fix these before adding:\n- " + "\n- ".join(errors))
+            elif queued:
+                st.session_state._pending_products.append(new_dict)
+                st.success(f"Queued: {new_dict['name']}.")
             else:
+                # add_product appends to the in-memory list; the catalogue
+                # isn't on screen here, so no forced rerun / reload
                 add_product(products, new_dict)
                 st.success(f"Added product: {new_dict['name']}.")
-                st.rerun()
+
+    # Bulk entry: queued products are saved with a single insert
+    pending = st.session_state._pending_products
+    if pending:
+        st.caption(f"{len(pending)} product(s) queued: " + ", ".join(d["name"] for d in pending))
+        col_save_all, col_clear = st.columns([1, 1])
+        if col_save_all.button(f"Save {len(pending)} queued product(s)", use_container_width=True):
+            add_products(products, pending)
+            st.session_state._pending_products = []
+            st.success("Queued products added.")
+            st.rerun()
+        if col_clear.button("Discard queue", use_container_width=True):
+            st.session_state._pending_products = []
+            st.rerun()
 
 # -----------------------------
-# TAB 3: Edit / Delete
+# SECTION: Edit / Delete
 # -----------------------------
-with tab3:
+elif active_tab == "Edit / Delete":
     st.subheader("Edit or Delete Existing Products")
+    products = load_products()
+
+    updated_msg = st.session_state.pop("_product_updated_msg", None)
+    if updated_msg:
+        st.success(updated_msg)
 
     if not products:
         st.info("No products to edit yet.")
     else:
-        df_bdt = products_to_dataframe(products)
-
-        prod_name_map = {row["name"]: row["id"] for _, row in df_bdt.iterrows()}
-        selected_name = st.selectbox("Choose product", list(prod_name_map.keys()))
-        selected_id = prod_name_map[selected_name]
-
-        current = df_bdt[df_bdt["id"] == selected_id].iloc[0].to_dict()
-        sym = currency_symbol()
+        # options are ids (labelled by name); the edit-form defaults come
+        # straight from the selected Product
+        products_by_id = {p.id: p for p in products}
+        product_ids = list(products_by_id)
+        # a rename changes the option labels, which resets the selectbox,
+        # so the selected id is kept in session_state and passed as index
+        last_id = st.session_state.get("_edit_product_id")
+        selected_id = st.selectbox(
+            "Choose product",
+            product_ids,
+            index=product_ids.index(last_id) if last_id in products_by_id else 0,
+            format_func=lambda pid: products_by_id[pid].name,
+        )
+        st.session_state["_edit_product_id"] = selected_id
+        current = products_by_id[selected_id]
 
         with st.form("edit_product_form"):
-            colA, colB, colC = st.columns(3)
-
-            with colA:
-                product_code = st.text_input(
-                    "Product Code (optional)",
-                    value=current.get("product_code", "") or "",
-                    help=HELP_CODE,
-                )
-                name = st.text_input("Product Name*", value=current["name"], help=HELP_PRODUCT_NAME)
-                category = st.text_input("Category*", value=current["category"], help=HELP_CATEGORY)
-                notes = st.text_area("Notes", value=current.get("notes", ""))
-
-            with colB:
-                price = st.number_input(
-                    f"Selling Price ({sym})*",
-                    min_value=0.0,
-                    value=from_bdt(current["price_bdt"]),
-                    step=50.0,
-                    help=HELP_PRICE,
-                )
-                manufacturing_cost = st.number_input(
-                    f"Manufacturing Cost ({sym})*",
-                    min_value=0.0,
-                    value=from_bdt(current["manufacturing_cost_bdt"]),
-                    step=25.0,
-                    help=HELP_MANUFACTURING,
-                )
-                packaging_cost = st.number_input(
-                    f"Packaging Cost ({sym})",
-                    min_value=0.0,
-                    value=from_bdt(current["packaging_cost_bdt"]),
-                    step=10.0,
-                    help=HELP_PACKAGING,
-                )
-
-            with colC:
-                shipping_cost = st.number_input(
-                    f"Shipping Cost ({sym})",
-                    min_value=0.0,
-                    value=from_bdt(current["shipping_cost_bdt"]),
-                    step=10.0,
-                    help=HELP_SHIPPING,
-                )
-                marketing_cost = st.number_input(
-                    f"Marketing Cost per Unit ({sym})",
-                    min_value=0.0,
-                    value=from_bdt(current["marketing_cost_bdt"]),
-                    step=10.0,
-                    help=HELP_MARKETING,
-                )
-                return_rate = (
-                    st.slider(
-                        "Expected Return Rate (%)",
-                        0.0,
-                        50.0,
-                        float(current["return_rate_%"]),
-                        0.5,
-                        help=HELP_RETURN_RATE,
-                    )
-                    / 100.0
-                )
-                discount_rate = (
-                    st.slider(
-                        "Discount / Promo Rate (%)",
-                        0.0,
-                        80.0,
-                        float(current["discount_rate_%"]),
-                        0.5,
-                        help=HELP_DISCOUNT,
-                    )
-                    / 100.0
-                )
-                vat_included = st.toggle(
-                    "VAT Included in price?", value=bool(current["vat_included"]), help=HELP_VAT
-                )
+            updated = render_product_form(
+                {
+                    "product_code": current.product_code or "",
+                    "name": current.name,
+                    "category": current.category,
+                    "notes": current.notes,
+                    "price": from_bdt(current.price_bdt),
+                    "manufacturing_cost": from_bdt(current.manufacturing_cost_bdt),
+                    "packaging_cost": from_bdt(current.packaging_cost_bdt),
+                    "shipping_cost": from_bdt(current.shipping_cost_bdt),
+                    "marketing_cost": from_bdt(current.marketing_cost_bdt),
+                    "return_rate": current.return_rate,
+                    "discount_rate": current.discount_rate,
+                    "vat_included": current.vat_included,
+                }
+            )
 
             col_save, col_del = st.columns([1, 1])
             save_btn = col_save.form_submit_button("Save Changes")
             delete_btn = col_del.form_submit_button("Delete Product")
 
             if save_btn:
-                updated = {
-                    "product_code": product_code.strip() or None,
-                    "name": name.strip(),
-                    "category": category.strip(),
-                    # Convert to BDT for storage (DB)
-                    "price_bdt": to_bdt(price),
-                    "manufacturing_cost_bdt": to_bdt(manufacturing_cost),
-                    "packaging_cost_bdt": to_bdt(packaging_cost),
-                    "shipping_cost_bdt": to_bdt(shipping_cost),
-                    "marketing_cost_bdt": to_bdt(marketing_cost),
-                    "return_rate": float(return_rate),
-                    "discount_rate": float(discount_rate),
-                    "vat_included": bool(vat_included),
-                    "notes": notes.strip(),
-                }
-
                 errors = validate_product_dict(updated)
                 if errors:
                     st.error("Fix these before saving:\n- " + "\n- ".join(errors))
+                elif product_unchanged(updated, current):
+                    st.info("No changes to save.")
                 else:
+                    # rerun so the selector and its label pick up the new
+                    # values; the message is shown on the next run
                     update_product(products, selected_id, updated)
-                    st.success("Product updated.")
+                    st.session_state["_product_updated_msg"] = "Product updated."
                     st.rerun()
 
             if delete_btn:
                 delete_product(products, selected_id)
-                st.warning(f"Deleted: {selected_name}")
+                st.warning(f"Deleted: {current.name}")
                 st.rerun()
@@ -1,9 +1,11 @@
 # pages/2_Forecast_Dashboard.py
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from datetime import date, datetime
 
+from modules.theme import FORECAST_CSS, CHART_PALETTE, DARK_LAYOUT
 from modules.products import load_products, products_to_dataframe
 from modules.revenue import (
     build_campaign_forecast,
@@ -16,12 +18,10 @@ from modules.campaign_db import (
     create_campaign,
     get_latest_campaign_or_create_default,
     update_campaign,
-    fetch_campaign_products,
     save_campaign_products,
-    fetch_product_month_weights,
     save_product_month_weights,
-    fetch_size_breakdown,
     save_size_breakdown,
+    fetch_campaign_bundle,
 )
 
 # ============================================
@@ -40,11 +40,25 @@ def currency_symbol():
     return CURRENCY_SYMBOLS.get(st.session_state.currency, "৳")
 
 
+# This page has no currency selector, so the rate is fixed for the rerun
+rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
+
+# Money columns of the forecast frames (monthly, product summary, sizes)
+MONEY_COLUMNS = ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]
+
+
 def from_bdt(amount_bdt: float) -> float:
-    rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
     return float(amount_bdt) / rate
 
 
+def to_display(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of a forecast frame with its money columns in the display currency."""
+    out = df.copy()
+    if rate != 1.0:
+        out[MONEY_COLUMNS] = out[MONEY_COLUMNS].to_numpy(dtype=np.float64) / rate
+    return out
+
+
 # ============================================
 # Page Setup
 # ============================================
@@ -53,95 +67,7 @@ st.set_page_config(page_title="Forecast Dashboard", page_icon="📈", layout="wi
 # =========================================
 # Consistent dark styling
 # =========================================
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #11141b;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.panel {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.stDataFrame {
-    border-radius: 12px;
-    overflow: hidden;
-    background: var(--panel);
-}
-thead tr th {
-    background: #141923 !important;
-    color: var(--text) !important;
-    font-weight: 600 !important;
-}
-tbody tr td { color: var(--muted) !important; }
-.js-plotly-plot .plotly-title,
-.js-plotly-plot .legend text,
-.js-plotly-plot .xtick text,
-.js-plotly-plot .ytick text { fill: var(--text) !important; }
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.tab-container [role="tablist"] button {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 12px 12px 0 0;
-    color: var(--text);
-}
-.tab-container [role="tablist"] button[aria-selected="true"] {
-    border-bottom: 2px solid var(--accent);
-    color: var(--accent);
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(FORECAST_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -157,16 +83,79 @@ st.markdown(
 # -----------------------------
 # Load products
 # -----------------------------
+# Supabase reads (products, campaigns, campaign inputs) are cached in the
+# modules and cleared by their writes; the derived frame is memoised here
+# so reruns don't rebuild it.
+@st.cache_data(show_spinner=False)
+def products_df(products) -> pd.DataFrame:
+    return products_to_dataframe(products)
+
+
+# Forecast frames for a given set of inputs. Arguments are hashed by value
+# (products, quantities, weights, sizes), so reruns that change none of
+# them — other tabs, sidebar toggles — reuse the last result.
+@st.cache_data(show_spinner=False, max_entries=32)
+def campaign_forecast(
+    products, quantities, start_date, end_date, distribution_mode, per_product_month_weights, size_breakdown
+):
+    return build_campaign_forecast(
+        products=products,
+        quantities=quantities,
+        start_date=start_date,
+        end_date=end_date,
+        distribution_mode=distribution_mode,
+        per_product_month_weights=per_product_month_weights,
+        size_breakdown=size_breakdown,
+    )
+
+
 products = load_products()
-prod_df_bdt = products_to_dataframe(products)
+prod_df_bdt = products_df(products)
 
 if prod_df_bdt.empty:
     st.warning("No products found. Please add products in **Product Management** first.")
     st.stop()
 
 sym = currency_symbol()
-chart_bg = "#0f1119"
-palette = ["#4BA3FF", "#2EE6D6", "#1F8BAE", "#7C5CFF", "#FF6B6B", "#FFC857"]
+
+
+# Forecast charts, memoised on their data and currency symbol: reruns
+# that don't change the forecast reuse the built figures.
+
+# Above this many points the line chart is drawn with WebGL instead of SVG
+# (plotly's own "auto" switch only kicks in past 1000).
+WEBGL_MIN_POINTS = 500
+
+
+@st.cache_data(show_spinner=False)
+def revenue_line_chart(month_table: pd.DataFrame, sym: str):
+    fig = px.line(
+        month_table,
+        x="month_nice",
+        y="effective_revenue",
+        markers=True,
+        title=f"Effective Revenue Over Campaign ({sym})",
+        color_discrete_sequence=CHART_PALETTE,
+        render_mode="webgl" if len(month_table) > WEBGL_MIN_POINTS else "auto",
+    )
+    fig.update_layout(**DARK_LAYOUT, height=420, xaxis_title="", yaxis_title=sym)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def product_revenue_bar_chart(ps: pd.DataFrame, sym: str):
+    fig = px.bar(
+        ps,
+        x="product_name",
+        y="effective_revenue",
+        color="category",
+        title=f"Effective Revenue by Product ({sym})",
+        text_auto=".0f",
+        color_discrete_sequence=CHART_PALETTE,
+    )
+    fig.update_layout(**DARK_LAYOUT, height=420, xaxis_title="", yaxis_title=sym)
+    return fig
+
 
 # ==========================
 # Campaign selection + setup
@@ -222,10 +211,8 @@ start_date_db = datetime.fromisoformat(curr_campaign["start_date"]).date()
 end_date_db = datetime.fromisoformat(curr_campaign["end_date"]).date()
 distribution_mode_db = curr_campaign.get("distribution_mode", "Uniform")
 
-# Load persistent inputs
-db_quantities, _ = fetch_campaign_products(selected_campaign_id)
-db_sizes = fetch_size_breakdown(selected_campaign_id)
-db_product_weights = fetch_product_month_weights(selected_campaign_id)
+# Load persistent inputs (the per-campaign reads run concurrently)
+db_quantities, _, db_product_weights, db_sizes = fetch_campaign_bundle(selected_campaign_id)
 
 # -----------------------------
 # Sidebar / Campaign Setup
@@ -245,7 +232,8 @@ with st.sidebar:
         st.rerun()
 
     months = month_range(start_date_ui, end_date_ui)
-    st.caption(", ".join([month_label_to_nice(m) for m in months]) or "—")
+    nice_months = [month_label_to_nice(m) for m in months]
+    st.caption(", ".join(nice_months) or "—")
 
     distribution_mode = st.selectbox(
         "Sales Distribution Mode",
@@ -269,7 +257,6 @@ with st.sidebar:
 # Main Tabs
 # -----------------------------
 product_month_weights = {}
-custom_month_weights = None  # kept for compatibility, unused for per-product path
 
 tab1, tab2, tab3 = st.tabs(["Quantities", "Forecast Output", "Size Breakdown"])
 
@@ -294,116 +281,150 @@ with tab1:
         st.stop()
 
     sel_prod_df = prod_df_bdt[prod_df_bdt["name"].isin(sel_products)]
+    sel_ids = sel_prod_df["id"].tolist()
+    sel_names = sel_prod_df["name"].tolist()
     quantities = {}
     size_breakdown = {}
 
-    for _, row in sel_prod_df.iterrows():
-        pid = row["id"]
-        pname = row["name"]
-        cat = row["category"]
-        prefill_qty = float(db_quantities.get(pid, 100.0))
-
-        with st.expander(f"{pname} · {cat}", expanded=True):
-            colA, colB, colC = st.columns(3)
-
-            with colA:
-                qty_total = st.number_input(
-                    f"Total units for {pname}",
-                    min_value=0.0,
-                    value=prefill_qty,
-                    step=10.0,
-                    key=f"qty_{selected_campaign_id}_{pid}",
-                )
-                quantities[pid] = float(qty_total)
-
-            with colB:
-                st.metric(f"Price ({sym})", f"{from_bdt(row['price_bdt']):.2f}")
-                st.metric(f"Effective Price ({sym})", f"{from_bdt(row['effective_price']):.2f}")
-
-            with colC:
-                st.metric(f"Unit Net Profit ({sym})", f"{from_bdt(row['unit_net_profit']):.2f}")
-                st.metric("Net Margin %", f"{row['net_margin_%']:.1f}%")
-
-            if enable_size_breakdown:
-                sizes = ["XS", "S", "M", "L", "XL", "XXL"]
-                cols = st.columns(len(sizes))
-                sb = {}
-                prefill_sizes = db_sizes.get(pid, {})
-
-                for i, s in enumerate(sizes):
-                    with cols[i]:
-                        sb[s] = st.number_input(
-                            f"{s}",
-                            min_value=0.0,
-                            value=float(prefill_sizes.get(s, 0.0)),
-                            step=1.0,
-                            key=f"size_{selected_campaign_id}_{pid}_{s}",
-                        )
-                size_breakdown[pid] = sb
-
-            # --------------------------------------------
-            # Per-product custom monthly percentages
-            # --------------------------------------------
-            if distribution_mode == "Custom":
-                st.markdown("#### Custom Monthly % for this Product")
-
-                existing = db_product_weights.get(pid, {})  # {month_label: weight}
-                this_weights = {}
-                used_pct = 0.0
-
-                for i, m in enumerate(months):
-                    nice = month_label_to_nice(m)
-
-                    # Last month auto-fills remaining %
-                    if i == len(months) - 1:
-                        remaining = max(0.0, 100.0 - used_pct)
-                        this_weights[m] = remaining
-                        units = qty_total * remaining / 100.0
-                        st.markdown(f"**{nice}: {remaining:.1f}% → ≈ {units:.1f} units (auto)**")
-                    else:
-                        prefill = float(existing.get(m, 0.0))
-                        pct = st.number_input(
-                            f"{nice} (%) for {pname}",
-                            min_value=0.0,
-                            max_value=100.0,
-                            value=prefill,
-                            step=1.0,
-                            key=f"pct_{selected_campaign_id}_{pid}_{m}",
-                        )
-                        pct = float(pct)
-                        this_weights[m] = pct
-                        used_pct += pct
-
-                        units = qty_total * pct / 100.0
-                        st.caption(f"≈ {units:.1f} units")
-
-                product_month_weights[pid] = this_weights
-
-                total_pct = sum(this_weights.values())
+    # Inputs sit in a form: edits are applied (and saved) together on
+    # "Save quantities", not one write per cell / number change.
+    with st.form(f"quantities_form_{selected_campaign_id}"):
+        # One editable grid per input instead of a set of widgets per product.
+        # Editor state is positional, so a different selection gets new grids.
+        grid_key = f"{selected_campaign_id}_{abs(hash(tuple(sel_ids)))}"
+        money_format = st.column_config.NumberColumn(format="%.2f")
+
+        qty_grid = pd.DataFrame(
+            {
+                "product_id": sel_ids,
+                "Product": sel_names,
+                "Category": sel_prod_df["category"].tolist(),
+                f"Price ({sym})": sel_prod_df["price_bdt"].to_numpy(dtype=np.float64) / rate,
+                f"Effective Price ({sym})": sel_prod_df["effective_price"].to_numpy(dtype=np.float64) / rate,
+                f"Unit Net Profit ({sym})": sel_prod_df["unit_net_profit"].to_numpy(dtype=np.float64) / rate,
+                "Net Margin %": sel_prod_df["net_margin_%"].to_numpy(dtype=np.float64),
+                "Total units": [float(db_quantities.get(pid, 100.0)) for pid in sel_ids],
+            }
+        )
+        edited_qty = st.data_editor(
+            qty_grid,
+            key=f"qty_editor_{grid_key}",
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            disabled=[c for c in qty_grid.columns if c != "Total units"],
+            column_config={
+                "product_id": None,
+                f"Price ({sym})": money_format,
+                f"Effective Price ({sym})": money_format,
+                f"Unit Net Profit ({sym})": money_format,
+                "Net Margin %": st.column_config.NumberColumn(format="%.1f%%"),
+                "Total units": st.column_config.NumberColumn(min_value=0.0, step=10.0),
+            },
+        )
+        # a cleared cell comes back as NaN → 0 units
+        quantities = dict(zip(sel_ids, edited_qty["Total units"].fillna(0.0).astype(float).tolist()))
+
+        if enable_size_breakdown:
+            st.markdown("#### Units per Size")
+            sizes = ["XS", "S", "M", "L", "XL", "XXL"]
+            size_grid = pd.DataFrame(
+                {
+                    "product_id": sel_ids,
+                    "Product": sel_names,
+                    **{sz: [float(db_sizes.get(pid, {}).get(sz, 0.0)) for pid in sel_ids] for sz in sizes},
+                }
+            )
+            edited_sizes = st.data_editor(
+                size_grid,
+                key=f"size_editor_{grid_key}",
+                num_rows="fixed",
+                hide_index=True,
+                use_container_width=True,
+                disabled=["Product"],
+                column_config={
+                    "product_id": None,
+                    **{sz: st.column_config.NumberColumn(min_value=0.0, step=1.0) for sz in sizes},
+                },
+            )
+            size_matrix = edited_sizes[sizes].fillna(0.0).to_numpy(dtype=np.float64)
+            size_breakdown = {
+                pid: dict(zip(sizes, row.tolist())) for pid, row in zip(sel_ids, size_matrix)
+            }
+
+        # --------------------------------------------
+        # Per-product custom monthly percentages
+        # --------------------------------------------
+        # One grid (rows = products, columns = months); the last month is
+        # not editable and takes whatever is left of 100%.
+        if distribution_mode == "Custom":
+            st.markdown("#### Custom Monthly % per Product")
+            pct_cols = nice_months[:-1]
+            st.caption(f"{nice_months[-1]} auto-fills the remaining % for each product.")
+
+            pct_grid = pd.DataFrame(
+                {
+                    "product_id": sel_ids,
+                    "Product": sel_names,
+                    **{
+                        nice: [float(db_product_weights.get(pid, {}).get(m, 0.0)) for pid in sel_ids]
+                        for m, nice in zip(months[:-1], pct_cols)
+                    },
+                }
+            )
+            edited_pcts = st.data_editor(
+                pct_grid,
+                key=f"pct_editor_{grid_key}_{months[0]}_{months[-1]}",
+                num_rows="fixed",
+                hide_index=True,
+                use_container_width=True,
+                disabled=["Product"],
+                column_config={
+                    "product_id": None,
+                    **{
+                        nice: st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=1.0)
+                        for nice in pct_cols
+                    },
+                },
+            )
+
+            pct_matrix = edited_pcts[pct_cols].fillna(0.0).to_numpy(dtype=np.float64).reshape(len(sel_ids), -1)
+            used_pct = pct_matrix.sum(axis=1)
+            pct_matrix = np.column_stack([pct_matrix, np.maximum(0.0, 100.0 - used_pct)])
+            product_month_weights.update(
+                {pid: dict(zip(months, row.tolist())) for pid, row in zip(sel_ids, pct_matrix)}
+            )
+
+            qty_vec = np.array([quantities[pid] for pid in sel_ids], dtype=np.float64)
+            units_grid = pd.DataFrame(
+                qty_vec[:, None] * pct_matrix / 100.0, columns=nice_months
+            )
+            units_grid.insert(0, "Product", sel_names)
+            st.caption("≈ Units per month")
+            st.dataframe(units_grid.round(1), use_container_width=True, hide_index=True)
+
+            for pname, total_pct in zip(sel_names, pct_matrix.sum(axis=1)):
                 if abs(total_pct - 100.0) > 0.01:
                     st.warning(
                         f"Total percentage for {pname} = {total_pct:.1f}%. "
                         "The last month auto-adjusts, but try to keep the sum near 100%."
                     )
 
-    save_campaign_products(selected_campaign_id, quantities)
+        submitted = st.form_submit_button("Save quantities", type="primary")
 
-    # We keep custom_month_weights for backwards compatibility,
-    # but per-product weights are the primary thing for Custom mode.
-    custom_month_weights = None
+    # Writes happen only on an explicit submit; other reruns (sidebar,
+    # product selection, tab switches) just read.
+    if submitted:
+        save_campaign_products(selected_campaign_id, quantities)
 
-    if distribution_mode == "Custom" and product_month_weights:
-        # Save per-product month percentages (as weights)
-        save_product_month_weights(selected_campaign_id, product_month_weights)
-    else:
-        # For non-Custom modes, you can optionally clear legacy campaign-level weights
-        # or leave them alone. We'll leave them as-is here.
-        pass
+        if distribution_mode == "Custom" and product_month_weights:
+            # Save per-product month percentages (as weights)
+            save_product_month_weights(selected_campaign_id, product_month_weights)
 
-    if enable_size_breakdown:
-        save_size_breakdown(selected_campaign_id, size_breakdown)
+        if enable_size_breakdown:
+            save_size_breakdown(selected_campaign_id, size_breakdown)
 
-    st.success("Saved to Supabase.")
+        st.success("Saved to Supabase.")
 
 # =====================================================================
 # TAB 2 — Forecast Output
@@ -411,15 +432,14 @@ with tab1:
 with tab2:
     st.subheader("Forecast Output")
 
-    monthly_df_bdt, product_summary_df_bdt, size_df_bdt = build_campaign_forecast(
-        products=products,
-        quantities=quantities,
-        start_date=start_date_ui,
-        end_date=end_date_ui,
-        distribution_mode=distribution_mode,
-        custom_month_weights=custom_month_weights,
-        per_product_month_weights=product_month_weights if distribution_mode == "Custom" else None,
-        size_breakdown=size_breakdown if enable_size_breakdown else None,
+    monthly_df_bdt, product_summary_df_bdt, size_df_bdt = campaign_forecast(
+        products,
+        quantities,
+        start_date_ui,
+        end_date_ui,
+        distribution_mode,
+        product_month_weights if distribution_mode == "Custom" else None,
+        size_breakdown if enable_size_breakdown else None,
     )
 
     totals_bdt = campaign_totals(monthly_df_bdt)
@@ -438,17 +458,12 @@ with tab2:
     st.divider()
 
     if not product_summary_df_bdt.empty:
-        ps = product_summary_df_bdt.copy()
-        for col in ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]:
-            ps[col] = ps[col].apply(from_bdt)
+        ps = to_display(product_summary_df_bdt)
         st.dataframe(ps, use_container_width=True, hide_index=True)
 
-    mt = monthly_df_bdt.copy()
-    for col in ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]:
-        mt[col] = mt[col].apply(from_bdt)
-
-    month_table = (
-        mt.groupby(["month", "month_nice"], as_index=False)
+    # Aggregate in BDT first, then convert the (one row per month) result
+    month_table = to_display(
+        monthly_df_bdt.groupby(["month", "month_nice"], as_index=False)
         .agg(
             qty=("qty", "sum"),
             gross_revenue=("gross_revenue", "sum"),
@@ -465,55 +480,16 @@ with tab2:
     # Line chart
     # ========================================
     with colA:
-        fig1 = px.line(
-            month_table,
-            x="month_nice",
-            y="effective_revenue",
-            markers=True,
-            title=f"Effective Revenue Over Campaign ({sym})",
-            color_discrete_sequence=palette,
-        )
-
-        fig1.update_layout(
-            height=420,
-            plot_bgcolor=chart_bg,
-            paper_bgcolor=chart_bg,
-            font_color="#e6edf3",
-            xaxis_title="",
-            yaxis_title=f"{sym}",
-            legend=dict(font=dict(color="#e6edf3")),
-        )
-
-        st.plotly_chart(fig1, use_container_width=True)
+        st.plotly_chart(revenue_line_chart(month_table, sym), use_container_width=True)
 
     # ========================================
     # Bar chart
     # ========================================
     with colB:
         if not product_summary_df_bdt.empty:
-            fig2 = px.bar(
-                ps,
-                x="product_name",
-                y="effective_revenue",
-                color="category",
-                title=f"Effective Revenue by Product ({sym})",
-                text_auto=".0f",
-                color_discrete_sequence=palette,
-            )
-
-            fig2.update_layout(
-                height=420,
-                plot_bgcolor=chart_bg,
-                paper_bgcolor=chart_bg,
-                font_color="#e6edf3",
-                xaxis_title="",
-                yaxis_title=f"{sym}",
-                legend=dict(font=dict(color="#e6edf3")),
-            )
-
-            st.plotly_chart(fig2, use_container_width=True)
+            st.plotly_chart(product_revenue_bar_chart(ps, sym), use_container_width=True)
 
-    st.session_state["monthly_forecast_df"] = mt
+    st.session_state["monthly_forecast_df"] = to_display(monthly_df_bdt)
     st.session_state["product_summary_df"] = ps if not product_summary_df_bdt.empty else pd.DataFrame()
     st.session_state["size_df"] = size_df_bdt
 
@@ -530,8 +506,6 @@ with tab3:
     if size_df_bdt is None or size_df_bdt.empty:
         st.info("Input size quantities in Quantities tab.")
     else:
-        size_df = size_df_bdt.copy()
-        for col in ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]:
-            size_df[col] = size_df[col].apply(from_bdt)
+        size_df = to_display(size_df_bdt)
 
         st.dataframe(size_df, use_container_width=True, hide_index=True)
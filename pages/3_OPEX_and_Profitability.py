@@ -1,9 +1,11 @@
 # pages/3_OPEX_and_Profitability.py
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from datetime import date, datetime
 
+from modules.theme import DASHBOARD_CSS
 from modules.products import load_products
 from modules.revenue import build_campaign_forecast, campaign_totals, month_range, month_label_to_nice
 from modules.campaign_db import (
@@ -49,84 +51,7 @@ def from_bdt(amount_bdt: float) -> float:
 # Page Setup + Styling
 # ============================================
 st.set_page_config(page_title="OPEX & Profitability", page_icon="🏢", layout="wide")
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #0f1119;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.panel {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.stDataFrame {
-    border-radius: 12px;
-    overflow: hidden;
-    background: var(--panel);
-}
-thead tr th {
-    background: #141923 !important;
-    color: var(--text) !important;
-    font-weight: 600 !important;
-}
-tbody tr td { color: var(--muted) !important; }
-.js-plotly-plot .plotly-title,
-.js-plotly-plot .legend text,
-.js-plotly-plot .xtick text,
-.js-plotly-plot .ytick text { fill: var(--text) !important; }
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-.tab-container [role="tablist"] button {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 12px 12px 0 0;
-    color: var(--text);
-}
-.tab-container [role="tablist"] button[aria-selected="true"] {
-    border-bottom: 2px solid var(--accent);
-    color: var(--accent);
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -229,8 +154,10 @@ full_mt = revenue_month_table.merge(
 
 full_mt["net_profit_after_opex_bdt"] = full_mt["net_profit_variable_bdt"] - full_mt["opex_cost_bdt"]
 
-# Convert for display
-full_mt_disp = full_mt.copy()
+# Convert for display: full_mt is built fresh each run, so the display
+# columns are added to it directly (no full-frame copy)
+display_rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
+full_mt_disp = full_mt
 for c in [
     "gross_revenue_bdt",
     "effective_revenue_bdt",
@@ -239,7 +166,7 @@ for c in [
     "opex_cost_bdt",
     "net_profit_after_opex_bdt",
 ]:
-    full_mt_disp[c.replace("_bdt", "")] = full_mt_disp[c].apply(from_bdt)
+    full_mt_disp[c.replace("_bdt", "")] = full_mt[c].to_numpy(dtype=np.float64) / display_rate
 
 # headline totals
 total_opex_bdt = float(full_mt["opex_cost_bdt"].sum())
@@ -261,9 +188,10 @@ with tab1:
 
     if opex_rows:
         df_opex = pd.DataFrame(opex_rows)
-        df_disp = df_opex.copy()
-        df_disp["cost"] = df_disp["cost_bdt"].apply(from_bdt)
-        df_disp = df_disp[["name", "category", "cost", "start_month", "end_month", "is_one_time", "notes"]]
+        # select the shown columns first instead of copying every field
+        df_disp = df_opex[["name", "category", "cost_bdt", "start_month", "end_month", "is_one_time", "notes"]]
+        df_disp = df_disp.rename(columns={"cost_bdt": "cost"})
+        df_disp["cost"] = df_disp["cost"].to_numpy(dtype=np.float64) / display_rate
         st.dataframe(df_disp, use_container_width=True, hide_index=True)
     else:
         st.info("No OPEX items yet. Add your first one below.")
@@ -1,10 +1,12 @@
 # pages/4_Scenario_Planning.py
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
-from modules.products import load_products, products_to_dataframe
+from modules.theme import DASHBOARD_CSS
+from modules.products import load_products, total_unit_cost
 from modules.campaign_db import fetch_campaigns
 from modules.scenarios_db import (
     fetch_scenarios,
@@ -57,84 +59,7 @@ palette = ["#4BA3FF", "#2EE6D6", "#1F8BAE", "#7C5CFF", "#FF6B6B", "#FFC857"]
 # Page setup + styling
 # ============================================
 st.set_page_config(page_title="Scenario Planning", page_icon="🧭", layout="wide")
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #0f1119;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.panel {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.stDataFrame {
-    border-radius: 12px;
-    overflow: hidden;
-    background: var(--panel);
-}
-thead tr th {
-    background: #141923 !important;
-    color: var(--text) !important;
-    font-weight: 600 !important;
-}
-tbody tr td { color: var(--muted) !important; }
-.js-plotly-plot .plotly-title,
-.js-plotly-plot .legend text,
-.js-plotly-plot .xtick text,
-.js-plotly-plot .ytick text { fill: var(--text) !important; }
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-.tab-container [role="tablist"] button {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 12px 12px 0 0;
-    color: var(--text);
-}
-.tab-container [role="tablist"] button[aria-selected="true"] {
-    border-bottom: 2px solid var(--accent);
-    color: var(--accent);
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -151,7 +76,6 @@ st.markdown(
 # Load base data
 # ============================================
 products = load_products()
-prod_df_bdt = products_to_dataframe(products)
 
 campaigns = fetch_campaigns()
 if not campaigns:
@@ -277,20 +201,21 @@ with tab1:
     st.divider()
 
     override_rows = []
-    for _, row in prod_df_bdt.iterrows():
-        pid = row["id"]
-        pname = row["name"]
-        cat = row["category"]
+    # straight off the Product objects: no DataFrame / per-row Series needed
+    for p in products:
+        pid = p.id
+        pname = p.name
+        cat = p.category
 
         ov = prod_ov_map.get(pid, {})
 
         with st.expander(f"{pname} · {cat}", expanded=False):
             c1, c2, c3, c4, c5 = st.columns(5)
 
-            base_price = float(row["price_bdt"])
-            base_disc = float(row["discount_rate_%"])
-            base_ret = float(row["return_rate_%"])
-            base_cost = float(row["total_unit_cost"])
+            base_price = float(p.price_bdt)
+            base_disc = float(p.discount_rate) * 100
+            base_ret = float(p.return_rate) * 100
+            base_cost = total_unit_cost(p)
 
             with c1:
                 p_override_disp = st.number_input(
@@ -505,19 +430,20 @@ with tab4:
 
     st.divider()
 
-    ps = product_summary_df_bdt.copy()
-    for col in ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]:
-        ps[col] = ps[col].apply(from_bdt)
+    # The forecast frames are fresh per run: convert money columns in place
+    # (one divide per column, no full-frame copy)
+    money_cols = ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]
+    display_rate = st.session_state.exchange_rates.get(st.session_state.currency, 1.0)
+
+    ps = product_summary_df_bdt
+    ps[money_cols] = ps[money_cols].to_numpy(dtype=np.float64) / display_rate
 
     st.markdown("### Product-Level Outcome")
     st.dataframe(ps, use_container_width=True, hide_index=True)
 
-    mt = monthly_df_bdt.copy()
-    for col in ["gross_revenue", "effective_revenue", "total_cost", "net_profit"]:
-        mt[col] = mt[col].apply(from_bdt)
-
+    # grouped in BDT, then only the monthly rows are converted
     month_table = (
-        mt.groupby(["month", "month_nice"], as_index=False)
+        monthly_df_bdt.groupby(["month", "month_nice"], as_index=False)
         .agg(
             qty=("qty", "sum"),
             gross_revenue=("gross_revenue", "sum"),
@@ -527,6 +453,7 @@ with tab4:
         )
         .sort_values("month")
     )
+    month_table[money_cols] = month_table[money_cols].to_numpy(dtype=np.float64) / display_rate
 
     st.markdown("### Monthly Outcome")
     st.dataframe(month_table, use_container_width=True, hide_index=True)
@@ -1,5 +1,6 @@
 # pages/5_Settings.py
 import streamlit as st
+from modules.theme import SETTINGS_CSS
 
 # =====================================================
 # Ensure global currency state exists
@@ -21,59 +22,7 @@ def currency_symbol():
 # Page Config + styling
 # =====================================================
 st.set_page_config(page_title="Settings", page_icon="⚙️", layout="wide")
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #0f1119;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.panel {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(SETTINGS_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import io
 
+from modules.theme import REPORTS_CSS
 from modules.products import load_products
 from modules.campaign_db import (
     fetch_campaigns,
@@ -40,66 +41,7 @@ def to_excel(sheets: dict) -> bytes:
 # Page Config + Styling
 # ============================================================
 st.set_page_config(page_title="Reports & Exports", page_icon="📑", layout="wide")
-st.markdown(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=Inter:wght@400;600&display=swap');
-:root {
-    --bg: #0b0c10;
-    --panel: #0f1119;
-    --border: #1f2533;
-    --text: #e8ecf3;
-    --muted: #9ea5b4;
-    --accent: #3dd598;
-    --accent-2: #7dd3fc;
-}
-html, body, [class*="css"] {
-    background: var(--bg);
-    color: var(--text);
-    font-family: 'Space Grotesk','Inter',system-ui,-apple-system,sans-serif;
-}
-.main { background: var(--bg); }
-h1, h2, h3, h4 { color: var(--text); letter-spacing: -0.3px; font-weight: 700; }
-.panel {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-}
-.pill {
-    display: inline-block;
-    padding: 6px 12px;
-    border-radius: 999px;
-    background: rgba(61,213,152,0.12);
-    border: 1px solid rgba(61,213,152,0.25);
-    color: var(--accent);
-    font-size: 12px;
-    letter-spacing: 0.4px;
-    text-transform: uppercase;
-}
-.hero {
-    background: radial-gradient(circle at 18% 22%, rgba(61,213,152,0.12), transparent 30%),
-                radial-gradient(circle at 85% 10%, rgba(125,211,252,0.16), transparent 26%),
-                linear-gradient(120deg, #0b0c10 0%, #0e1119 70%, #0b0c10 100%);
-    border: 1px solid var(--border);
-    border-radius: 18px;
-    padding: 26px 24px;
-    box-shadow: 0 18px 60px rgba(0,0,0,0.45);
-    margin-bottom: 16px;
-}
-.hero h2 { margin: 0; font-size: 28px; letter-spacing: -0.35px; }
-.hero p { margin-top: 10px; color: var(--muted); line-height: 1.6; }
-.section {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 14px 16px;
-    margin-bottom: 12px;
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(REPORTS_CSS, unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -212,7 +154,7 @@ else:
 # ============================================================
 st.header("Scenario Reports Export")
 
-scenarios = fetch_scenarios()
+scenarios = fetch_scenarios(columns="*")
 if not scenarios:
     st.info("No scenarios found.")
 else:
@@ -223,10 +165,11 @@ else:
     if st.button("Generate Scenario Excel Report"):
         s = next(s for s in scenarios if s["id"] == scenario_id)
 
-        prod_overrides = fetch_scenario_products(scenario_id)
-        opex_overrides = fetch_scenario_opex(scenario_id)
-        fx_overrides = fetch_scenario_fx(scenario_id)
-        campaign_links = fetch_scenario_campaign_links(scenario_id)
+        # full rows: the report exports every column
+        prod_overrides = fetch_scenario_products(scenario_id, columns="*")
+        opex_overrides = fetch_scenario_opex(scenario_id, columns="*")
+        fx_overrides = fetch_scenario_fx(scenario_id, columns="*")
+        campaign_links = fetch_scenario_campaign_links(scenario_id, columns="*")
 
         excel_bytes = to_excel(
             {